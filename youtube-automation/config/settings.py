@@ -28,6 +28,7 @@ YOUTUBE_CLIENT_SECRET = os.getenv("YOUTUBE_CLIENT_SECRET")
 YOUTUBE_REFRESH_TOKEN = os.getenv("YOUTUBE_REFRESH_TOKEN")
 VIDEO_CATEGORY_ID = os.getenv("VIDEO_CATEGORY_ID", "28")  # Science & Technology
 VIDEO_PRIVACY = os.getenv("VIDEO_PRIVACY", "public")  # public, private, unlisted
+YOUTUBE_UPLOADER = os.getenv("YOUTUBE_UPLOADER", "googleapi")  # googleapi (8MB chunks) or aiohttp (one streamed PUT)
 
 # Email Configuration
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -50,14 +51,25 @@ PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
 # Video Settings
 VIDEO_RESOLUTION = (1920, 1080)  # 1080p
 VIDEO_FPS = 30
+VIDEO_HW_ENCODER = os.getenv("VIDEO_HW_ENCODER", "auto")  # auto, none, or an encoder like h264_nvenc
+X264_PRESET = os.getenv("X264_PRESET", "veryfast")  # CPU fallback; slower presets trade time for size
+VIDEO_RENDERER = os.getenv("VIDEO_RENDERER", "auto")  # auto, ffmpeg (drawtext filtergraph), or moviepy
 THUMBNAIL_SIZE = (1280, 720)
 
 # Audio Settings
 TTS_LANGUAGE = "en"
 BACKGROUND_MUSIC_VOLUME = 0.1  # 10% of original volume
+AUDIO_BITRATE = os.getenv("AUDIO_BITRATE", "128k")  # Transparent for spoken content
+
+# Cache Settings
+TTS_CACHE_DIR = OUTPUT_DIR / "tts_cache"
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "500"))
+FINAL_AUDIO_CACHE_DIR = OUTPUT_DIR / "final_cache"
+FINAL_AUDIO_CACHE_MAX_MB = int(os.getenv("FINAL_AUDIO_CACHE_MAX_MB", "500"))
+LLM_CACHE_DIR = OUTPUT_DIR / ".llm_cache"
 
 # Content Topics (Evergreen Tech Topics)
-EVERGREEN_TOPICS = [
+EVERGREEN_TOPICS = (
     "artificial intelligence basics",
     "cybersecurity tips",
     "programming fundamentals",
@@ -73,4 +85,4 @@ EVERGREEN_TOPICS = [
     "virtual reality and augmented reality",
     "software engineering principles",
     "database management systems",
-]
+)
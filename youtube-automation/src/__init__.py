@@ -0,0 +1,4 @@
+"""
+YouTube Automation
+Automated tech video generation and upload pipeline
+"""
@@ -3,16 +3,136 @@ Audio Producer Module
 Generates TTS audio and mixes with background music
 """
 import os
+import re
+import queue
+import functools
+import hashlib
+import shutil
+import tempfile
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from gtts import gTTS
-from pydub import AudioSegment
-from pydub.generators import Sine
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
 from config.settings import (
     TTS_LANGUAGE, BACKGROUND_MUSIC_VOLUME, OUTPUT_DIR, ASSETS_DIR,
-    ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID
+    ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID, TTS_CACHE_DIR, TTS_CACHE_MAX_MB,
+    AUDIO_BITRATE, FINAL_AUDIO_CACHE_DIR, FINAL_AUDIO_CACHE_MAX_MB
 )
+from .media_utils import probe_duration
+
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+
+# PCM format used for in-memory mixing
+MIX_SAMPLE_RATE = 44100
+MIX_CHANNELS = 2
+
+# Background music level relative to the voiceover
+MUSIC_GAIN_DB = -(20 - int(BACKGROUND_MUSIC_VOLUME * 100))
+MUSIC_FADE_IN = 2  # seconds
+MUSIC_FADE_OUT = 3  # seconds
+
+# Upper bound on concurrent TTS requests across all producers (API rate limits)
+TTS_MAX_CONCURRENCY = 4
+_TTS_SLOTS = threading.BoundedSemaphore(TTS_MAX_CONCURRENCY)
+
+# Syntheses in progress, keyed by cache path, so the prefetch worker and the
+# audio stage never request the same sentence twice
+_IN_FLIGHT = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+# MP3 encoding runs here so callers can move on to other work
+_EXPORT_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio-export")
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# Shared HTTP session so repeated ElevenLabs calls reuse the TLS connection
+_EL_SESSION = requests.Session()
+_EL_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+
+def _evict_lru(cache_dir, max_bytes, target_bytes=None):
+    """Once the cache exceeds max_bytes, delete least recently used files down to target_bytes
+    
+    target_bytes defaults to max_bytes. Returns the bytes left in the cache.
+    """
+    if target_bytes is None:
+        target_bytes = max_bytes
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total += stat.st_size
+    
+    if total <= max_bytes:
+        return total
+    
+    entries.sort()
+    for _, size, path in entries:
+        if total <= target_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+
+# Running size of each cache directory, so writes only rescan it once it's over budget.
+# Eviction trims to a low-water mark so a full cache isn't rescanned on every write.
+CACHE_EVICT_LOW_WATER = 0.9
+_CACHE_SIZES = {}
+_CACHE_SIZES_LOCK = threading.Lock()
+
+
+def _track_cache_write(cache_dir, max_bytes, added_bytes):
+    """Count a new cache entry, scanning and evicting only when the cache outgrows max_bytes"""
+    with _CACHE_SIZES_LOCK:
+        total = _CACHE_SIZES.get(cache_dir)
+        if total is not None and total + added_bytes <= max_bytes:
+            total += added_bytes
+        else:
+            # A fresh scan already includes the new entry
+            total = _evict_lru(cache_dir, max_bytes, int(max_bytes * CACHE_EVICT_LOW_WATER))
+        _CACHE_SIZES[cache_dir] = total
+
+
+@functools.lru_cache(maxsize=None)
+def _pydub():
+    """Import pydub on first use (it probes for ffmpeg at import time)"""
+    from pydub import AudioSegment
+    return AudioSegment
+
+
+@functools.lru_cache(maxsize=None)
+def _gtts():
+    """Import gTTS on first use"""
+    from gtts import gTTS
+    return gTTS
+
+
+def _decode(path, sample_rate=MIX_SAMPLE_RATE, channels=MIX_CHANNELS):
+    """Decode an audio file to int16 PCM frames via an ffmpeg pipe"""
+    raw = subprocess.check_output([
+        "ffmpeg", "-v", "quiet", "-i", str(path),
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "pipe:1"
+    ])
+    return np.frombuffer(raw, dtype=np.int16).reshape(-1, channels)
+
+
+def _decode_bytes(data, sample_rate=MIX_SAMPLE_RATE, channels=MIX_CHANNELS):
+    """Decode in-memory encoded audio to int16 PCM frames via ffmpeg stdin/stdout"""
+    result = subprocess.run([
+        "ffmpeg", "-v", "quiet", "-i", "pipe:0",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "pipe:1"
+    ], input=data, stdout=subprocess.PIPE, check=True)
+    return np.frombuffer(result.stdout, dtype=np.int16).reshape(-1, channels)
 
 
 class AudioProducer:
@@ -22,6 +142,14 @@ class AudioProducer:
         self.music_dir = ASSETS_DIR / "music"
         self.output_dir = OUTPUT_DIR
         self.use_elevenlabs = bool(ELEVENLABS_API_KEY)
+        self.tts_cache_dir = TTS_CACHE_DIR
+        self.tts_cache_dir.mkdir(exist_ok=True)
+        self.tts_cache_max_bytes = TTS_CACHE_MAX_MB * 1024 * 1024
+        self.final_cache_dir = FINAL_AUDIO_CACHE_DIR
+        self.final_cache_dir.mkdir(exist_ok=True)
+        self.final_cache_max_bytes = FINAL_AUDIO_CACHE_MAX_MB * 1024 * 1024
+        self._prefetch_queue = None
+        self._prefetch_thread = None
     
     def text_to_speech(self, text, output_path=None, use_premium=False):
         """Convert text to speech"""
@@ -31,10 +159,89 @@ class AudioProducer:
         print(f"🎙️ Generating TTS audio...")
         print(f"Text length: {len(text)} characters")
         
+        audio_path = self._synthesize(text, output_path, use_premium)
+        print(f"✅ TTS audio saved to: {audio_path}")
+        return audio_path
+    
+    def text_to_pcm(self, text, use_premium=False):
+        """Convert text to speech as int16 PCM frames, without an intermediate file"""
+        print(f"🎙️ Generating TTS audio...")
+        print(f"Text length: {len(text)} characters")
+        
+        parts = self._synthesize_sentences(text, use_premium)
+        mp3_data = b"".join(Path(part_path).read_bytes() for part_path in parts)
+        if not mp3_data:
+            return np.zeros((0, MIX_CHANNELS), dtype=np.int16)
+        
+        pcm = _decode_bytes(mp3_data)
+        print(f"✅ TTS audio decoded: {len(pcm) / MIX_SAMPLE_RATE:.1f} seconds")
+        return pcm
+    
+    def _synthesize_sentences(self, text, use_premium=False):
+        """Synthesize each sentence in parallel, returning cached MP3 paths in order"""
+        def synthesize(sentence):
+            with _TTS_SLOTS:
+                return self._synthesize(sentence, None, use_premium)
+        
+        with ThreadPoolExecutor(max_workers=TTS_MAX_CONCURRENCY) as executor:
+            return list(executor.map(synthesize, self._split_sentences(text)))
+    
+    def start_prefetch(self):
+        """Start a background worker that synthesizes text into the TTS cache
+        
+        Each call gets its own queue, so a previous worker can keep draining
+        while a new script starts streaming.
+        """
+        self._prefetch_queue = queue.Queue()
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch_worker,
+            args=(self._prefetch_queue,),
+            daemon=True
+        )
+        self._prefetch_thread.start()
+    
+    def prefetch_tts(self, text):
+        """Queue text for background synthesis (no-op if prefetch isn't running)"""
+        if self._prefetch_queue is not None and text:
+            self._prefetch_queue.put(text)
+    
+    def finish_prefetch(self, wait=False):
+        """Signal the prefetch worker that no more text is coming"""
+        if self._prefetch_queue is None:
+            return
+        
+        self._prefetch_queue.put(None)
+        if wait and self._prefetch_thread:
+            self._prefetch_thread.join()
+        self._prefetch_queue = None
+    
+    def _prefetch_worker(self, text_queue):
+        """Drain queued text, warming the cache one sentence at a time"""
+        while True:
+            text = text_queue.get()
+            if text is None:
+                break
+            
+            for sentence in self._split_sentences(text):
+                try:
+                    with _TTS_SLOTS:
+                        self._synthesize(sentence, None)
+                except Exception as e:
+                    print(f"⚠️ TTS prefetch failed: {e}")
+    
+    def _split_sentences(self, text):
+        """Split text into sentences for independent synthesis"""
+        return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+    
+    def _synthesize(self, text, output_path, use_premium=False):
+        """Run the best available TTS backend for a piece of text
+        
+        Returns output_path, or the cached MP3 when output_path is None.
+        """
         # Try ElevenLabs if available and requested
         if use_premium and self.use_elevenlabs:
             try:
-                audio_path = self._elevenlabs_tts(text, output_path)
+                audio_path = self._cached_tts(text, output_path, "elevenlabs", self._elevenlabs_tts)
                 print(f"✅ Premium TTS generated: {audio_path}")
                 return audio_path
             except Exception as e:
@@ -42,20 +249,84 @@ class AudioProducer:
         
         # Use Google TTS (free)
         try:
-            tts = gTTS(text=text, lang=TTS_LANGUAGE, slow=False)
-            tts.save(str(output_path))
-            print(f"✅ TTS audio saved to: {output_path}")
-            return output_path
+            return self._cached_tts(text, output_path, "gtts", self._gtts_tts)
         except Exception as e:
             print(f"❌ TTS generation failed: {e}")
             raise
     
+    def _cache_path(self, text, backend):
+        """Content-addressed cache location for a TTS rendering"""
+        if backend == "elevenlabs":
+            voice_id, model_id = ELEVENLABS_VOICE_ID or "", ELEVENLABS_MODEL_ID
+        else:
+            voice_id, model_id = "", backend
+        
+        key = "\0".join([backend, text, voice_id, model_id, TTS_LANGUAGE])
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.tts_cache_dir / f"{digest}.mp3"
+    
+    def _cached_tts(self, text, output_path, backend, synthesize):
+        """Serve TTS from the on-disk cache, synthesizing only on a miss"""
+        cache_path = self._cache_path(text, backend)
+        
+        while True:
+            with _IN_FLIGHT_LOCK:
+                if cache_path.exists():
+                    pending = None
+                else:
+                    pending = _IN_FLIGHT.get(cache_path)
+                    if pending is None:
+                        _IN_FLIGHT[cache_path] = Future()
+                        break
+            
+            if pending is None:
+                print(f"♻️ Using cached TTS audio: {cache_path.name}")
+                os.utime(cache_path)  # Mark as recently used
+                if not output_path:
+                    return cache_path
+                shutil.copyfile(cache_path, output_path)
+                return output_path
+            
+            # Another thread is synthesizing this text; wait, then re-check (and retry if it failed)
+            pending.exception()
+        
+        # Synthesize next to the cache entry, then atomically move it into place
+        tmp_path = None
+        try:
+            fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=self.tts_cache_dir)
+            os.close(fd)
+            tmp_path = Path(tmp_name)
+            synthesize(text, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except BaseException as e:
+            self._finish_in_flight(cache_path).set_exception(e)
+            raise
+        finally:
+            if tmp_path and tmp_path.exists():
+                tmp_path.unlink()
+        self._finish_in_flight(cache_path).set_result(cache_path)
+        
+        _track_cache_write(self.tts_cache_dir, self.tts_cache_max_bytes, cache_path.stat().st_size)
+        if not output_path:
+            return cache_path
+        shutil.copyfile(cache_path, output_path)
+        return output_path
+    
+    def _finish_in_flight(self, cache_path):
+        """Remove and return the future other threads are waiting on for cache_path"""
+        with _IN_FLIGHT_LOCK:
+            return _IN_FLIGHT.pop(cache_path)
+    
+    def _gtts_tts(self, text, output_path):
+        """Generate TTS using Google TTS (free)"""
+        tts = _gtts()(text=text, lang=TTS_LANGUAGE, slow=False)
+        tts.save(str(output_path))
+        return output_path
+    
     def _elevenlabs_tts(self, text, output_path):
         """Generate TTS using ElevenLabs API (premium quality)"""
         try:
-            import requests
-            
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
+            url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}/stream"
             
             headers = {
                 "Accept": "audio/mpeg",
@@ -63,115 +334,233 @@ class AudioProducer:
                 "xi-api-key": ELEVENLABS_API_KEY
             }
             
+            params = {
+                "optimize_streaming_latency": 3,
+                "output_format": "mp3_44100_128"
+            }
+            
             data = {
                 "text": text,
-                "model_id": "eleven_monolingual_v1",
+                "model_id": ELEVENLABS_MODEL_ID,
                 "voice_settings": {
                     "stability": 0.5,
                     "similarity_boost": 0.75
                 }
             }
             
-            response = requests.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            # Stream the audio straight to disk as it is synthesized
+            with _EL_SESSION.post(url, json=data, headers=headers, params=params,
+                                  stream=True, timeout=(5, 60)) as response:
+                response.raise_for_status()
+                
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=4096):
+                        if chunk:
+                            f.write(chunk)
             
             return output_path
         except Exception as e:
             raise Exception(f"ElevenLabs TTS failed: {e}")
     
-    def add_background_music(self, voiceover_path, music_path=None, output_path=None):
-        """Mix voiceover with background music"""
+    def add_background_music(self, voiceover_path, music_path=None, output_path=None,
+                             music=None, background=False):
+        """Mix voiceover with background music
+        
+        voiceover_path may also be int16 PCM frames from text_to_pcm.
+        With background=True the MP3 encode runs on a worker thread and a
+        Future resolving to output_path is returned instead.
+        """
         print(f"🎵 Adding background music...")
         
         if not output_path:
             output_path = self.output_dir / "audio_final.mp3"
         
         # Load voiceover
-        voiceover = AudioSegment.from_mp3(voiceover_path)
-        voiceover_duration = len(voiceover)
-        
-        # Get or create background music
-        if music_path and Path(music_path).exists():
-            music = AudioSegment.from_file(music_path)
+        if isinstance(voiceover_path, np.ndarray):
+            voiceover = voiceover_path
         else:
-            # Generate simple background music if none provided
-            print("⚠️ No background music found, generating simple ambient track...")
-            music = self._generate_ambient_music(voiceover_duration)
-        
-        # Adjust music volume
-        music = music - (20 - int(BACKGROUND_MUSIC_VOLUME * 100))  # Reduce volume
+            voiceover = _decode(voiceover_path)
         
-        # Loop or trim music to match voiceover duration
-        if len(music) < voiceover_duration:
-            # Loop music
-            loops_needed = (voiceover_duration // len(music)) + 1
-            music = music * loops_needed
+        # Music files are looped, faded, mixed and encoded natively by ffmpeg
+        if music is None and music_path and Path(music_path).exists():
+            if background:
+                return _EXPORT_POOL.submit(self._ffmpeg_mix, voiceover, music_path, output_path)
+            return self._ffmpeg_mix(voiceover, music_path, output_path)
         
-        music = music[:voiceover_duration]
-        
-        # Fade in/out music
-        music = music.fade_in(2000).fade_out(3000)
+        if music is None:
+            # Generate simple background music if none provided
+            print("⚠️ No background music found, generating simple ambient track...")
+            music = self._ambient_samples(len(voiceover), MIX_SAMPLE_RATE)[:, None]
         
         # Mix audio
-        final_audio = voiceover.overlay(music)
+        mixed = self._mix_with_music(voiceover, music, MIX_SAMPLE_RATE)
+        final_audio = _pydub()(
+            mixed.tobytes(),
+            frame_rate=MIX_SAMPLE_RATE,
+            sample_width=2,
+            channels=MIX_CHANNELS
+        )
         
         # Export
-        final_audio.export(output_path, format="mp3", bitrate="192k")
+        if background:
+            return _EXPORT_POOL.submit(self._export_mp3, final_audio, output_path)
+        return self._export_mp3(final_audio, output_path)
+    
+    def _export_mp3(self, audio, output_path):
+        """Encode the final mix to MP3"""
+        audio.export(output_path, format="mp3", bitrate=AUDIO_BITRATE)
         print(f"✅ Final audio saved to: {output_path}")
+        return output_path
+    
+    def _ffmpeg_mix(self, voiceover, music_path, output_path):
+        """Mix PCM voiceover with a music file and encode, all in one ffmpeg process"""
+        duration = len(voiceover) / MIX_SAMPLE_RATE
+        fade_out_start = max(0.0, duration - MUSIC_FADE_OUT)
+        filter_graph = (
+            f"[1:a]volume={MUSIC_GAIN_DB}dB,"
+            f"afade=t=in:st=0:d={MUSIC_FADE_IN},"
+            f"afade=t=out:st={fade_out_start:.3f}:d={MUSIC_FADE_OUT}[m];"
+            f"[0:a][m]amix=inputs=2:duration=first:dropout_transition=0:normalize=0"
+        )
         
+        subprocess.run([
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "s16le", "-ar", str(MIX_SAMPLE_RATE), "-ac", str(MIX_CHANNELS), "-i", "pipe:0",
+            "-stream_loop", "-1", "-i", str(music_path),
+            "-filter_complex", filter_graph,
+            "-ac", str(MIX_CHANNELS), "-b:a", AUDIO_BITRATE,
+            str(output_path)
+        ], input=voiceover.tobytes(), check=True)
+        
+        print(f"✅ Final audio saved to: {output_path}")
         return output_path
     
-    def _generate_ambient_music(self, duration_ms):
-        """Generate simple ambient background music"""
+    def _mix_with_music(self, v, m, frame_rate):
+        """Loop, fade and mix music under the voiceover in a single NumPy pass"""
+        n = len(v)
+        if n == 0 or len(m) == 0:
+            return v
+        
+        # Loop or trim music into a single float32 scratch buffer (mono music
+        # broadcasts across the voiceover's channels)
+        mixed = np.empty(v.shape, dtype=np.float32)
+        loop_len = len(m)
+        for start in range(0, n, loop_len):
+            stop = min(n, start + loop_len)
+            mixed[start:stop] = m[:stop - start]
+        
+        # Volume reduction plus fade in / fade out as one gain envelope
+        gain = 10 ** (MUSIC_GAIN_DB / 20)
+        envelope = np.full(n, gain, dtype=np.float32)
+        fade_in_n = min(n, MUSIC_FADE_IN * frame_rate)
+        fade_out_n = min(n, MUSIC_FADE_OUT * frame_rate)
+        envelope[:fade_in_n] *= np.linspace(0, 1, fade_in_n, dtype=np.float32)
+        envelope[n - fade_out_n:] *= np.linspace(1, 0, fade_out_n, dtype=np.float32)
+        
+        # Apply envelope, add voiceover and clip in place, then quantize once
+        np.multiply(mixed, envelope[:, None], out=mixed)
+        np.add(mixed, v, out=mixed)
+        np.clip(mixed, -32768, 32767, out=mixed)
+        
+        return mixed.astype(np.int16)
+    
+    def _ambient_samples(self, n, sample_rate=44100):
+        """Synthesize n mono int16 frames of ambient music"""
         # Create a simple ambient track with multiple sine waves
         frequencies = [220, 330, 440, 550]  # A3, E4, A4, C#5 (A major chord)
+        amplitudes = [0.1, 0.056, 0.056, 0.056]  # -20 dB base tone, -25 dB harmonics
         
-        # Generate base tone
-        ambient = Sine(frequencies[0]).to_audio_segment(duration=duration_ms, volume=-20)
+        t = np.arange(n, dtype=np.float32) / sample_rate
         
-        # Add harmonics
-        for freq in frequencies[1:]:
-            tone = Sine(freq).to_audio_segment(duration=duration_ms, volume=-25)
-            ambient = ambient.overlay(tone)
+        signal = np.zeros(n, dtype=np.float32)
+        for freq, amp in zip(frequencies, amplitudes):
+            signal += amp * np.sin(2 * np.pi * freq * t)
         
         # Add fade in/out
-        ambient = ambient.fade_in(3000).fade_out(3000)
+        fade_n = min(n // 2, 3 * sample_rate)
+        signal[:fade_n] *= np.linspace(0, 1, fade_n, dtype=np.float32)
+        signal[n - fade_n:] *= np.linspace(1, 0, fade_n, dtype=np.float32)
         
-        return ambient
+        return (signal * 32767).astype(np.int16)
     
     def get_audio_duration(self, audio_path):
         """Get duration of audio file in seconds"""
-        audio = AudioSegment.from_file(audio_path)
-        return len(audio) / 1000.0
+        return probe_duration(audio_path)
+    
+    def _final_cache_path(self, text, music_path):
+        """Cache location for a finished mix of this text and music"""
+        if music_path and Path(music_path).exists():
+            music_key = f"{Path(music_path).resolve()}|{Path(music_path).stat().st_mtime}"
+        else:
+            music_key = "ambient"
+        
+        key = f"{text}|{music_key}|{BACKGROUND_MUSIC_VOLUME}|{AUDIO_BITRATE}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.final_cache_dir / f"{digest}.mp3"
+    
+    def _store_final(self, output_path, cache_path):
+        """Copy a finished mix into the final audio cache"""
+        fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=self.final_cache_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp_name)
+            os.replace(tmp_name, cache_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        _track_cache_write(self.final_cache_dir, self.final_cache_max_bytes, cache_path.stat().st_size)
     
-    def create_full_audio(self, text, music_path=None, output_path=None):
-        """Complete audio production pipeline"""
+    def create_full_audio(self, text, music_path=None, output_path=None, background_export=False):
+        """Complete audio production pipeline
+        
+        With background_export=True the first item returned is a Future that
+        resolves to the final audio path once the MP3 encode finishes.
+        """
         print("\n" + "="*50)
         print("AUDIO PRODUCTION PIPELINE")
         print("="*50)
         
-        # Step 1: Generate TTS
-        voiceover_path = self.output_dir / "temp_voiceover.mp3"
-        self.text_to_speech(text, voiceover_path)
-        
-        # Step 2: Add background music
         if not output_path:
             output_path = self.output_dir / "audio_final.mp3"
         
-        final_audio = self.add_background_music(voiceover_path, music_path, output_path)
+        # Reuse a previous mix of the exact same inputs
+        cache_path = self._final_cache_path(text, music_path)
+        if cache_path.exists():
+            print(f"♻️ Using cached final audio: {cache_path.name}")
+            os.utime(cache_path)  # Mark as recently used
+            shutil.copyfile(cache_path, output_path)
+            duration = self.get_audio_duration(output_path)
+            print(f"\n✅ Audio production complete!")
+            print(f"Duration: {duration:.1f} seconds ({duration/60:.1f} minutes)")
+            print(f"Output: {output_path}")
+            
+            if background_export:
+                done = Future()
+                done.set_result(output_path)
+                return done, duration
+            return output_path, duration
+        
+        # Step 1: Generate TTS (kept as PCM in memory)
+        voiceover = self.text_to_pcm(text)
+        
+        # Step 2: Add background music; this is the only MP3 encode
+        final_audio = self.add_background_music(
+            voiceover, music_path, output_path,
+            background=background_export
+        )
         
-        # Get duration
-        duration = self.get_audio_duration(final_audio)
+        if background_export:
+            final_audio.add_done_callback(
+                lambda f: f.exception() is None and self._store_final(output_path, cache_path)
+            )
+        else:
+            self._store_final(output_path, cache_path)
+        
+        # Get duration (the mix is exactly as long as the voiceover)
+        duration = len(voiceover) / MIX_SAMPLE_RATE
         print(f"\n✅ Audio production complete!")
         print(f"Duration: {duration:.1f} seconds ({duration/60:.1f} minutes)")
-        print(f"Output: {final_audio}")
-        
-        # Clean up temp file
-        if voiceover_path.exists() and voiceover_path != output_path:
-            voiceover_path.unlink()
+        print(f"Output: {output_path}")
         
         return final_audio, duration
 
@@ -5,21 +5,81 @@ Generates evergreen tech video scripts using OpenAI API
 import json
 import random
 from datetime import datetime
-from pathlib import Path
 from openai import OpenAI
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encode/decode
+    orjson = None
 from config.settings import OPENAI_API_KEY, OPENAI_MODEL, EVERGREEN_TOPICS, OUTPUT_DIR
+from .http_client import shared_http_client
+
+# Number of AI topics requested per refill of the topic pool
+TOPIC_POOL_SIZE = 25
+
+# Script fields that are spoken, in the order they're narrated
+SPOKEN_FIELDS = ("hook", "introduction", "content", "conclusion")
+
+
+class _SpokenFieldScanner:
+    """Incrementally scan streamed JSON and report spoken string values as they close"""
+    
+    def __init__(self, callback, keys=SPOKEN_FIELDS):
+        self.callback = callback
+        self.keys = set(keys)
+        self.in_string = False
+        self.escape = False
+        self.expecting_value = False
+        self.current_key = None
+        self.buffer = []
+    
+    def feed(self, chunk):
+        for char in chunk:
+            if self.in_string:
+                if self.escape:
+                    self.buffer.append(char)
+                    self.escape = False
+                elif char == "\\":
+                    self.buffer.append(char)
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    self._close_string("".join(self.buffer))
+                else:
+                    self.buffer.append(char)
+            elif char == '"':
+                self.in_string = True
+                self.buffer = []
+            elif char == ":":
+                self.expecting_value = True
+            elif char in ",{[":
+                self.expecting_value = False
+    
+    def _close_string(self, raw):
+        if not self.expecting_value:
+            self.current_key = raw
+            return
+        
+        self.expecting_value = False
+        if self.current_key in self.keys:
+            try:
+                self.callback(json.loads(f'"{raw}"'))
+            except json.JSONDecodeError:
+                pass
 
 
 class ContentGenerator:
     """Generate video scripts using AI"""
     
+    _shared_client = None
+    
     def __init__(self):
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        if ContentGenerator._shared_client is None:
+            ContentGenerator._shared_client = OpenAI(api_key=OPENAI_API_KEY, http_client=shared_http_client())
+        self.client = ContentGenerator._shared_client
         self.model = OPENAI_MODEL
+        self.topic_pool_path = OUTPUT_DIR / "topic_pool.json"
     
     def generate_topic(self):
         """Generate or select an evergreen tech topic"""
@@ -27,27 +87,64 @@ class ContentGenerator:
         if random.random() < 0.5:
             return random.choice(EVERGREEN_TOPICS)
         
-        # Option 2: Generate new topic using AI
-        prompt = """Generate a single evergreen technology topic that would make a great educational YouTube video.
-        The topic should be:
+        # Option 2: Take the next AI-generated topic from the pool
+        pool = self._load_topic_pool()
+        if not pool:
+            pool = self._generate_topic_pool()
+        if not pool:
+            # The AI refill failed; pick locally without persisting, so the next run retries it
+            return random.choice(EVERGREEN_TOPICS)
+        
+        topic = pool.pop(0)
+        self._save_topic_pool(pool)
+        return topic
+    
+    def _load_topic_pool(self):
+        """Read the cached pool of AI-generated topics"""
+        try:
+            with open(self.topic_pool_path, 'r', encoding='utf-8') as f:
+                pool = json.load(f)
+            return [t for t in pool if isinstance(t, str) and t.strip()]
+        except (OSError, ValueError):
+            return []
+    
+    def _save_topic_pool(self, pool):
+        """Persist the remaining topics for future runs"""
+        with open(self.topic_pool_path, 'w', encoding='utf-8') as f:
+            json.dump(pool, f, indent=2, ensure_ascii=False)
+    
+    def _generate_topic_pool(self):
+        """Generate a batch of topics in a single API call (empty list on failure)"""
+        prompt = f"""Generate {TOPIC_POOL_SIZE} distinct evergreen technology topics that would make great educational YouTube videos.
+        Each topic should be:
         - Timeless and relevant for years
         - Educational and informative
         - Interesting to tech enthusiasts
         - Suitable for a 5-10 minute video
         
-        Return ONLY the topic title, nothing else."""
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.8,
-            max_tokens=50
-        )
+        Return a JSON object of the form {{"topics": ["topic title", ...]}}."""
         
-        return response.choices[0].message.content.strip()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.8,
+                max_tokens=50 * TOPIC_POOL_SIZE,
+                response_format={"type": "json_object"}
+            )
+            
+            data = json.loads(response.choices[0].message.content)
+            return [t.strip() for t in data.get("topics", []) if isinstance(t, str) and t.strip()]
+        except Exception as e:
+            print(f"⚠️ Topic generation failed, using predefined topics: {e}")
+            return []
     
-    def generate_script(self, topic=None):
-        """Generate a complete video script"""
+    def generate_script(self, topic=None, on_section=None):
+        """Generate a complete video script
+        
+        If on_section is given, it is called with each spoken section's text
+        as soon as that section finishes streaming from the model.
+        """
         if not topic:
             topic = self.generate_topic()
         
@@ -78,26 +175,33 @@ Structure the script as JSON with the following format:
     "estimated_duration": "duration in minutes"
 }}
 
-Make it informative, engaging, and valuable for viewers."""
+Make it informative, engaging, and valuable for viewers.
+Respond with valid JSON only."""
 
         response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
-            max_tokens=2500
+            max_tokens=2500,
+            response_format={"type": "json_object"},
+            stream=True
         )
         
-        script_text = response.choices[0].message.content.strip()
+        scanner = _SpokenFieldScanner(on_section) if on_section else None
+        parts = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            parts.append(delta)
+            if scanner:
+                scanner.feed(delta)
+        
+        script_text = "".join(parts).strip()
         
         # Parse JSON response
         try:
-            # Remove markdown code blocks if present
-            if script_text.startswith("```"):
-                script_text = script_text.split("```")[1]
-                if script_text.startswith("json"):
-                    script_text = script_text[4:]
-            
-            script_data = json.loads(script_text)
+            script_data = orjson.loads(script_text) if orjson else json.loads(script_text)
         except json.JSONDecodeError:
             # Fallback: create structured data from text
             script_data = {
@@ -140,8 +244,12 @@ Make it informative, engaging, and valuable for viewers."""
         
         filepath = OUTPUT_DIR / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(script_data, f, indent=2, ensure_ascii=False)
+        if orjson:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(script_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(script_data, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Script saved to: {filepath}")
         return filepath
@@ -2,18 +2,192 @@
 Email Notifier Module
 Sends email notifications when videos are published
 """
+import atexit
 import smtplib
+import textwrap
+from html import escape
+from string import Template
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from pathlib import Path
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import (
     SMTP_SERVER, SMTP_PORT, SMTP_EMAIL, SMTP_PASSWORD, NOTIFICATION_EMAIL
 )
 
 
+# Styles shared by every notification
+_BASE_CSS = """
+        body {
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        .header {
+            color: white;
+            padding: 30px;
+            border-radius: 10px 10px 0 0;
+            text-align: center;
+        }
+        .content {
+            background: #f9f9f9;
+            padding: 30px;
+            border-radius: 0 0 10px 10px;
+        }
+        .label {
+            font-weight: bold;
+        }
+        .footer {
+            text-align: center;
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+            color: #666;
+            font-size: 12px;
+        }"""
+
+_SUCCESS_CSS = _BASE_CSS + """
+        .header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        }
+        .video-link {
+            display: inline-block;
+            background: #FF0000;
+            color: white;
+            padding: 15px 30px;
+            text-decoration: none;
+            border-radius: 5px;
+            margin: 20px 0;
+            font-weight: bold;
+        }
+        .info-box {
+            background: white;
+            padding: 15px;
+            margin: 15px 0;
+            border-left: 4px solid #667eea;
+            border-radius: 5px;
+        }
+        .label {
+            color: #667eea;
+        }"""
+
+_ERROR_CSS = _BASE_CSS + """
+        .header {
+            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        }
+        .error-box {
+            background: #fff3cd;
+            border: 1px solid #ffc107;
+            padding: 15px;
+            margin: 15px 0;
+            border-radius: 5px;
+        }
+        .label {
+            color: #f5576c;
+        }"""
+
+_FOOTER = """
+    <div class="footer">
+        <p>This is an automated notification from YouTube Automation Pipeline</p>
+        <p>Generated by Tech Master Toolkit</p>
+    </div>"""
+
+_SUCCESS_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <style>$css
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🎉 Video Published Successfully!</h1>
+        <p>Your automated video is now live on YouTube</p>
+    </div>
+    
+    <div class="content">
+        <div class="info-box">
+            <p class="label">Video Title:</p>
+            <p>$title</p>
+        </div>
+        
+        <div class="info-box">
+            <p class="label">Video ID:</p>
+            <p>$video_id</p>
+        </div>
+        
+        <div class="info-box">
+            <p class="label">Description Preview:</p>
+            <p>$description</p>
+        </div>
+        
+        <div class="info-box">
+            <p class="label">Tags:</p>
+            <p>$tags</p>
+        </div>
+        
+        <div class="info-box">
+            <p class="label">Hashtags:</p>
+            <p>$hashtags</p>
+        </div>
+        
+        <center>
+            <a href="$video_url" class="video-link">▶️ Watch Video on YouTube</a>
+        </center>
+        
+        <div class="info-box">
+            <p class="label">Published:</p>
+            <p>$published</p>
+        </div>
+    </div>
+    """ + _FOOTER + """
+</body>
+</html>
+""")
+
+_ERROR_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <style>$css
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>❌ Pipeline Error</h1>
+        <p>The video automation pipeline encountered an error</p>
+    </div>
+    
+    <div class="content">
+        <div class="error-box">
+            <p class="label">Failed Stage:</p>
+            <p>$stage</p>
+        </div>
+        
+        <div class="error-box">
+            <p class="label">Error Message:</p>
+            <p>$error_message</p>
+        </div>
+        
+        <div class="error-box">
+            <p class="label">Time:</p>
+            <p>$time</p>
+        </div>
+        
+        <p><strong>Action Required:</strong></p>
+        <ul>
+            <li>Check the logs for detailed error information</li>
+            <li>Verify API credentials and configurations</li>
+            <li>Ensure all dependencies are installed</li>
+            <li>Check network connectivity</li>
+        </ul>
+    </div>
+    """ + _FOOTER + """
+</body>
+</html>
+""")
+
+
 class EmailNotifier:
     """Send email notifications"""
     
@@ -23,6 +197,8 @@ class EmailNotifier:
         self.sender_email = SMTP_EMAIL
         self.sender_password = SMTP_PASSWORD
         self.recipient_email = NOTIFICATION_EMAIL or SMTP_EMAIL
+        self._smtp = None
+        atexit.register(self.close)
     
     def send_success_notification(self, video_data, metadata):
         """Send notification when video is successfully published"""
@@ -79,11 +255,12 @@ class EmailNotifier:
             html_part = MIMEText(html_content, "html")
             message.attach(html_part)
             
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(message)
+            # Reuse the authenticated connection, reconnecting once if it dropped
+            try:
+                self._get_smtp().send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                self._get_smtp().send_message(message)
             
             return True
         
@@ -91,212 +268,65 @@ class EmailNotifier:
             print(f"❌ Email sending failed: {e}")
             return False
     
+    def _get_smtp(self):
+        """Return a logged-in SMTP connection, opening one only when needed"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        
+        if self.smtp_port == 465:
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        
+        self._smtp = server
+        return server
+    
+    def close(self):
+        """Close the cached SMTP connection"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        finally:
+            self._smtp = None
+    
     def _create_success_email_html(self, video_data, metadata):
         """Create HTML content for success notification"""
         video_url = video_data.get('video_url', '#')
         video_id = video_data.get('video_id', 'N/A')
-        title = metadata.get('title', 'Untitled')
-        description = metadata.get('description', '')[:200] + '...'
-        tags = ', '.join(metadata.get('tags', [])[:10])
-        hashtags = ' '.join(metadata.get('hashtags', []))
+        title = textwrap.shorten(metadata.get('title', 'Untitled'), width=100, placeholder='…')
+        description = textwrap.shorten(metadata.get('description', ''), width=200, placeholder='…')
+        tags = ', '.join(escape(tag) for tag in metadata.get('tags', [])[:10])
+        hashtags = ' '.join(escape(tag) for tag in metadata.get('hashtags', []))
         
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    border-radius: 10px 10px 0 0;
-                    text-align: center;
-                }}
-                .content {{
-                    background: #f9f9f9;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .video-link {{
-                    display: inline-block;
-                    background: #FF0000;
-                    color: white;
-                    padding: 15px 30px;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    font-weight: bold;
-                }}
-                .info-box {{
-                    background: white;
-                    padding: 15px;
-                    margin: 15px 0;
-                    border-left: 4px solid #667eea;
-                    border-radius: 5px;
-                }}
-                .label {{
-                    font-weight: bold;
-                    color: #667eea;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    padding-top: 20px;
-                    border-top: 1px solid #ddd;
-                    color: #666;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🎉 Video Published Successfully!</h1>
-                <p>Your automated video is now live on YouTube</p>
-            </div>
-            
-            <div class="content">
-                <div class="info-box">
-                    <p class="label">Video Title:</p>
-                    <p>{title}</p>
-                </div>
-                
-                <div class="info-box">
-                    <p class="label">Video ID:</p>
-                    <p>{video_id}</p>
-                </div>
-                
-                <div class="info-box">
-                    <p class="label">Description Preview:</p>
-                    <p>{description}</p>
-                </div>
-                
-                <div class="info-box">
-                    <p class="label">Tags:</p>
-                    <p>{tags}</p>
-                </div>
-                
-                <div class="info-box">
-                    <p class="label">Hashtags:</p>
-                    <p>{hashtags}</p>
-                </div>
-                
-                <center>
-                    <a href="{video_url}" class="video-link">▶️ Watch Video on YouTube</a>
-                </center>
-                
-                <div class="info-box">
-                    <p class="label">Published:</p>
-                    <p>{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-                </div>
-            </div>
-            
-            <div class="footer">
-                <p>This is an automated notification from YouTube Automation Pipeline</p>
-                <p>Generated by Tech Master Toolkit</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+        return _SUCCESS_TEMPLATE.substitute(
+            css=_SUCCESS_CSS,
+            title=escape(title),
+            video_id=escape(str(video_id)),
+            description=escape(description),
+            tags=tags,
+            hashtags=hashtags,
+            video_url=escape(video_url),
+            published=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
     
     def _create_error_email_html(self, error_message, stage):
         """Create HTML content for error notification"""
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                    color: white;
-                    padding: 30px;
-                    border-radius: 10px 10px 0 0;
-                    text-align: center;
-                }}
-                .content {{
-                    background: #f9f9f9;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .error-box {{
-                    background: #fff3cd;
-                    border: 1px solid #ffc107;
-                    padding: 15px;
-                    margin: 15px 0;
-                    border-radius: 5px;
-                }}
-                .label {{
-                    font-weight: bold;
-                    color: #f5576c;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    padding-top: 20px;
-                    border-top: 1px solid #ddd;
-                    color: #666;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>❌ Pipeline Error</h1>
-                <p>The video automation pipeline encountered an error</p>
-            </div>
-            
-            <div class="content">
-                <div class="error-box">
-                    <p class="label">Failed Stage:</p>
-                    <p>{stage}</p>
-                </div>
-                
-                <div class="error-box">
-                    <p class="label">Error Message:</p>
-                    <p>{error_message}</p>
-                </div>
-                
-                <div class="error-box">
-                    <p class="label">Time:</p>
-                    <p>{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-                </div>
-                
-                <p><strong>Action Required:</strong></p>
-                <ul>
-                    <li>Check the logs for detailed error information</li>
-                    <li>Verify API credentials and configurations</li>
-                    <li>Ensure all dependencies are installed</li>
-                    <li>Check network connectivity</li>
-                </ul>
-            </div>
-            
-            <div class="footer">
-                <p>This is an automated notification from YouTube Automation Pipeline</p>
-                <p>Generated by Tech Master Toolkit</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
-
+        return _ERROR_TEMPLATE.substitute(
+            css=_ERROR_CSS,
+            stage=escape(str(stage)),
+            error_message=escape(str(error_message)),
+            time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
 
 def main():
     """Test the email notifier"""
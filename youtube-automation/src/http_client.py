@@ -0,0 +1,19 @@
+"""
+HTTP Client Module
+Pooled HTTP/2 client shared by every OpenAI-backed stage
+"""
+import importlib.util
+import httpx
+
+# One connection pool for the whole process, so sockets survive across stages and batch runs
+# (HTTP/2 needs the h2 package)
+_HTTP_CLIENT = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=60),
+    timeout=httpx.Timeout(30.0, connect=5.0)
+)
+
+
+def shared_http_client():
+    """Return the process-wide pooled HTTP client to pass as OpenAI(http_client=...)"""
+    return _HTTP_CLIENT
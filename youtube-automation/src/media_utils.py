@@ -0,0 +1,63 @@
+"""
+Media Utilities Module
+Font measurement and ffprobe helpers shared by the thumbnail, audio, and video stages
+"""
+import functools
+import subprocess
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont
+from config.settings import ASSETS_DIR
+
+SYSTEM_FONTS_DIR = Path("/usr/share/fonts/dejavu")
+
+# Scratch canvas for text measurement
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(name, size):
+    """Load a TrueType font once per (name, size), falling back to PIL's default"""
+    for candidate in (SYSTEM_FONTS_DIR / name, ASSETS_DIR / "fonts" / name, name):
+        try:
+            return ImageFont.truetype(str(candidate), size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=512)
+def measure_text(text, font_key):
+    """Return the bounding box of text in a (font file, size) font, measured once per pair"""
+    return _MEASURE_DRAW.textbbox((0, 0), text, font=load_font(*font_key))
+
+
+def _ffprobe(path, *args):
+    """Run ffprobe on a file and return its stdout; raises RuntimeError if it can't be read"""
+    try:
+        return subprocess.run(
+            ["ffprobe", "-v", "error", *args, "-of", "csv=p=0", str(path)],
+            capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        raise RuntimeError(f"ffprobe could not read {path}: {e}") from e
+
+
+@functools.lru_cache(maxsize=64)
+def _probe_duration(path, mtime, size):
+    """Memoized duration lookup; mtime and size key the result to the file's current state"""
+    output = _ffprobe(path, "-show_entries", "format=duration")
+    try:
+        return float(output)
+    except ValueError as e:
+        raise RuntimeError(f"ffprobe reported no duration for {path}") from e
+
+
+def probe_duration(path):
+    """Read a media file's duration in seconds without decoding it; raises RuntimeError on failure"""
+    stat = Path(path).stat()
+    return _probe_duration(str(path), stat.st_mtime, stat.st_size)
+
+
+def probe_codecs(path, stream_type):
+    """Return the codec names of a file's video ('v') or audio ('a') streams; raises RuntimeError on failure"""
+    return _ffprobe(path, "-select_streams", stream_type, "-show_entries", "stream=codec_name").split()
@@ -2,39 +2,63 @@
 Main Pipeline Orchestrator
 Coordinates the entire video generation and upload process
 """
+import sys
 import json
+import queue
+import atexit
+import asyncio
 import logging
+import logging.handlers
+import importlib
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encode
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
 
-from content_generator import ContentGenerator
-from seo_optimizer import SEOOptimizer
-from thumbnail_creator import ThumbnailCreator
-from audio_producer import AudioProducer
-from video_editor import VideoEditor
-from youtube_uploader import YouTubeUploader
-from email_notifier import EmailNotifier
 from config.settings import OUTPUT_DIR, LOGS_DIR
 
+# (attribute, module, class) for each stage implementation the pipeline drives
+PIPELINE_MODULES = (
+    ("content_gen", "content_generator", "ContentGenerator"),
+    ("seo_optimizer", "seo_optimizer", "SEOOptimizer"),
+    ("thumbnail_creator", "thumbnail_creator", "ThumbnailCreator"),
+    ("audio_producer", "audio_producer", "AudioProducer"),
+    ("video_editor", "video_editor", "VideoEditor"),
+    ("youtube_uploader", "youtube_uploader", "YouTubeUploader"),
+    ("email_notifier", "email_notifier", "EmailNotifier"),
+)
+
+
+def _build_module(module_name, class_name):
+    """Import a stage module and construct its class"""
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, class_name)()
+
 
 class VideoPipeline:
     """Orchestrate the complete video generation pipeline"""
     
     def __init__(self, log_level=logging.INFO):
+        self._executor = None
+        self.debug = log_level <= logging.DEBUG
         self.setup_logging(log_level)
+        atexit.register(self.close)
         self.logger = logging.getLogger(__name__)
         
-        # Initialize all modules
+        # Initialize all modules; their heavy imports (openai, PIL, moviepy, google) load in parallel
         self.logger.info("Initializing pipeline modules...")
-        self.content_gen = ContentGenerator()
-        self.seo_optimizer = SEOOptimizer()
-        self.thumbnail_creator = ThumbnailCreator()
-        self.audio_producer = AudioProducer()
-        self.video_editor = VideoEditor()
-        self.youtube_uploader = YouTubeUploader()
-        self.email_notifier = EmailNotifier()
+        with ThreadPoolExecutor(max_workers=len(PIPELINE_MODULES), thread_name_prefix="pipeline-init") as pool:
+            futures = {
+                attribute: pool.submit(_build_module, module_name, class_name)
+                for attribute, module_name, class_name in PIPELINE_MODULES
+            }
+        for attribute, future in futures.items():
+            setattr(self, attribute, future.result())
+        
+        # Worker threads for the blocking stage implementations
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pipeline")
         
         self.logger.info("✅ All modules initialized")
     
@@ -42,17 +66,48 @@ class VideoPipeline:
         """Setup logging configuration"""
         log_file = LOGS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
         
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        # Pipeline threads only enqueue records; a listener thread does the file/console IO
+        log_queue = queue.Queue(-1)
+        root = logging.getLogger()
+        self._log_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(self._log_handler)
+        root.setLevel(log_level)
+        
+        self._log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._log_listener.start()
+    
+    def close(self):
+        """Stop worker threads and flush queued log records"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._log_listener is not None:
+            # Detach first so nothing enqueues after the listener's final drain
+            logging.getLogger().removeHandler(self._log_handler)
+            self._log_listener.stop()
+            for handler in self._log_listener.handlers:
+                handler.close()
+            self._log_listener = None
     
     def run(self, topic=None, upload=True, send_email=True):
         """Run the complete pipeline"""
+        return asyncio.run(self._run_async(topic, upload, send_email))
+    
+    async def _in_executor(self, func, *args):
+        """Run a blocking stage on the pipeline's worker threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def _run_async(self, topic=None, upload=True, send_email=True):
+        """Run the pipeline, overlapping stages that don't depend on each other
+        
+        content -> {seo, audio}; seo -> thumbnail; {audio, thumbnail} -> video -> upload -> email
+        """
         self.logger.info("="*60)
         self.logger.info("STARTING YOUTUBE AUTOMATION PIPELINE")
         self.logger.info("="*60)
@@ -67,33 +122,39 @@ class VideoPipeline:
         try:
             # Stage 1: Generate Content
             self.logger.info("\n📝 STAGE 1: Content Generation")
-            script_data = self._generate_content(topic)
-            results['stages']['content_generation'] = {'status': 'success', 'data': script_data}
+            script_data = await self._in_executor(self._generate_content, topic)
+            results['stages']['content_generation'] = {'status': 'success', **self._script_summary(script_data)}
             
-            # Stage 2: Generate SEO Metadata
+            # Stages 2 and 4 only need the script, so SEO and audio run concurrently
             self.logger.info("\n🔍 STAGE 2: SEO Optimization")
-            metadata = self._generate_seo(script_data)
-            results['stages']['seo_optimization'] = {'status': 'success', 'data': metadata}
-            
-            # Stage 3: Create Thumbnail
-            self.logger.info("\n🎨 STAGE 3: Thumbnail Creation")
-            thumbnail_path = self._create_thumbnail(metadata)
-            results['stages']['thumbnail_creation'] = {'status': 'success', 'path': str(thumbnail_path)}
-            
-            # Stage 4: Generate Audio
             self.logger.info("\n🎙️ STAGE 4: Audio Production")
-            audio_path, duration = self._generate_audio(script_data)
-            results['stages']['audio_production'] = {'status': 'success', 'path': str(audio_path), 'duration': duration}
+            seo_task = asyncio.ensure_future(self._in_executor(self._generate_seo, script_data))
+            audio_task = asyncio.ensure_future(self._in_executor(self._generate_audio, script_data))
+            
+            try:
+                metadata = await seo_task
+                results['stages']['seo_optimization'] = {'status': 'success', **self._metadata_summary(metadata)}
+                
+                # Stage 3: Create Thumbnail (overlaps with the tail of audio production)
+                self.logger.info("\n🎨 STAGE 3: Thumbnail Creation")
+                thumbnail_path = await self._in_executor(self._create_thumbnail, metadata)
+                results['stages']['thumbnail_creation'] = {'status': 'success', 'path': str(thumbnail_path)}
+                
+                audio_path, duration = await audio_task
+                results['stages']['audio_production'] = {'status': 'success', 'path': str(audio_path), 'duration': duration}
+            except BaseException:
+                audio_task.cancel()
+                raise
             
             # Stage 5: Create Video
             self.logger.info("\n🎬 STAGE 5: Video Editing")
-            video_path = self._create_video(audio_path, thumbnail_path, script_data)
+            video_path = await self._in_executor(self._create_video, audio_path, thumbnail_path, script_data)
             results['stages']['video_editing'] = {'status': 'success', 'path': str(video_path)}
             
             # Stage 6: Upload to YouTube
             if upload:
                 self.logger.info("\n📤 STAGE 6: YouTube Upload")
-                upload_result = self._upload_to_youtube(video_path, metadata, thumbnail_path)
+                upload_result = await self._in_executor(self._upload_to_youtube, video_path, metadata, thumbnail_path)
                 results['stages']['youtube_upload'] = upload_result
                 
                 # Stage 7: Send Email Notification
@@ -141,10 +202,176 @@ class VideoPipeline:
             self._save_results(results)
             raise
     
+    def run_batch(self, topics, upload=True, send_email=True):
+        """Run the pipeline for several topics with stages overlapped across topics"""
+        return asyncio.run(self._run_batch_async(list(topics), upload, send_email))
+    
+    async def _run_batch_async(self, topics, upload=True, send_email=True):
+        """Stream topics through long-lived stage workers connected by bounded queues
+        
+        While topic N uploads, topic N+1 renders video, N+2 produces audio, and so on.
+        """
+        self.logger.info("="*60)
+        self.logger.info(f"STARTING BATCH PIPELINE ({len(topics)} topics)")
+        self.logger.info("="*60)
+        
+        stages = [
+            ("content_generation", self._batch_content, 1),
+            ("seo_optimization", self._batch_seo, 1),
+            ("media_production", self._batch_media, 2),
+            ("video_editing", self._batch_video, 1),
+        ]
+        if upload:
+            stages.append(("youtube_upload", self._batch_upload, 1))
+        
+        # Bounded queues apply backpressure; the last one collects finished jobs
+        queues = [asyncio.Queue(maxsize=2) for _ in stages] + [asyncio.Queue()]
+        executors = [
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"batch-{name}")
+            for name, _, workers in stages
+        ]
+        
+        tasks = [
+            asyncio.ensure_future(self._stage_worker(
+                name, handler, executors[i], queues[i], queues[i + 1], send_email
+            ))
+            for i, (name, handler, _) in enumerate(stages)
+        ]
+        
+        try:
+            for index, topic in enumerate(topics):
+                await queues[0].put(self._new_batch_job(index, topic))
+            await queues[0].put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=False)
+        
+        all_results = []
+        while True:
+            job = queues[-1].get_nowait()
+            if job is None:
+                break
+            all_results.append(self._finish_batch_job(job, upload, send_email))
+        
+        succeeded = sum(1 for r in all_results if r['status'] == 'success')
+        self.logger.info("\n" + "="*60)
+        self.logger.info(f"✅ BATCH COMPLETE: {succeeded}/{len(all_results)} succeeded")
+        self.logger.info("="*60)
+        
+        return sorted(all_results, key=lambda r: r['batch_index'])
+    
+    async def _stage_worker(self, name, handler, executor, in_queue, out_queue, send_email):
+        """Process jobs from in_queue until the sentinel arrives"""
+        loop = asyncio.get_running_loop()
+        
+        def run(func, *args):
+            return loop.run_in_executor(executor, func, *args)
+        
+        while True:
+            job = await in_queue.get()
+            if job is None:
+                await out_queue.put(None)
+                break
+            
+            # Failed jobs pass straight through so they are still reported
+            if not job['error']:
+                try:
+                    await handler(job, run)
+                except Exception as e:
+                    self.logger.error(f"❌ [{job['topic']}] {name} stage failed: {e}", exc_info=True)
+                    job['error'] = str(e)
+                    job['results']['stages'][name] = {'status': 'error', 'error': str(e)}
+            
+            await out_queue.put(job)
+    
+    def _new_batch_job(self, index, topic):
+        """Create the state carried through the batch stages for one topic"""
+        start_time = datetime.now()
+        return {
+            'index': index,
+            'topic': topic,
+            'start_time': start_time,
+            'error': None,
+            'results': {
+                'status': 'running',
+                'batch_index': index,
+                'start_time': start_time.isoformat(),
+                'stages': {}
+            }
+        }
+    
+    async def _batch_content(self, job, run):
+        job['script_data'] = await run(self._generate_content, job['topic'])
+        job['results']['stages']['content_generation'] = {'status': 'success', **self._script_summary(job['script_data'])}
+    
+    async def _batch_seo(self, job, run):
+        job['metadata'] = await run(self._generate_seo, job['script_data'])
+        job['results']['stages']['seo_optimization'] = {'status': 'success', **self._metadata_summary(job['metadata'])}
+    
+    async def _batch_media(self, job, run):
+        audio_output = OUTPUT_DIR / f"audio_final_{job['index']}.mp3"
+        thumbnail_path, (audio_path, duration) = await asyncio.gather(
+            run(self._create_thumbnail, job['metadata']),
+            run(self._generate_audio, job['script_data'], audio_output)
+        )
+        job['thumbnail_path'] = thumbnail_path
+        job['audio_path'] = audio_path
+        job['results']['stages']['thumbnail_creation'] = {'status': 'success', 'path': str(thumbnail_path)}
+        job['results']['stages']['audio_production'] = {'status': 'success', 'path': str(audio_path), 'duration': duration}
+    
+    async def _batch_video(self, job, run):
+        video_output = OUTPUT_DIR / f"final_video_{job['index']}.mp4"
+        job['video_path'] = await run(
+            self._create_video, job['audio_path'], job['thumbnail_path'], job['script_data'], video_output
+        )
+        job['results']['stages']['video_editing'] = {'status': 'success', 'path': str(job['video_path'])}
+    
+    async def _batch_upload(self, job, run):
+        upload_result = await run(self._upload_to_youtube, job['video_path'], job['metadata'], job['thumbnail_path'])
+        job['results']['stages']['youtube_upload'] = upload_result
+        if upload_result.get('status') != 'success':
+            raise RuntimeError(upload_result.get('error', 'Upload failed'))
+    
+    def _finish_batch_job(self, job, upload, send_email):
+        """Record the outcome of one batch job and send its notification"""
+        results = job['results']
+        end_time = datetime.now()
+        results['end_time'] = end_time.isoformat()
+        
+        if job['error']:
+            results['status'] = 'error'
+            results['error'] = job['error']
+            if send_email:
+                try:
+                    stage = self._get_failed_stage(results)
+                    self.email_notifier.send_error_notification(job['error'], stage)
+                except Exception:
+                    pass
+        else:
+            results['status'] = 'success'
+            results['duration_seconds'] = (end_time - job['start_time']).total_seconds()
+            if not upload:
+                results['stages']['youtube_upload'] = {'status': 'skipped'}
+            elif send_email:
+                self._send_notification(results['stages']['youtube_upload'], job['metadata'])
+                results['stages']['email_notification'] = {'status': 'success'}
+        
+        self._save_results(results, suffix=job['index'])
+        return results
+    
     def _generate_content(self, topic=None):
         """Generate video script"""
         try:
-            script_data = self.content_gen.generate_script(topic)
+            # Start synthesizing narration while the script is still streaming
+            self.audio_producer.start_prefetch()
+            try:
+                script_data = self.content_gen.generate_script(
+                    topic,
+                    on_section=self.audio_producer.prefetch_tts
+                )
+            finally:
+                self.audio_producer.finish_prefetch()
             self.content_gen.save_script(script_data)
             self.logger.info(f"✅ Script generated: {script_data.get('topic')}")
             return script_data
@@ -156,8 +383,8 @@ class VideoPipeline:
         """Generate SEO metadata"""
         try:
             metadata = self.seo_optimizer.generate_metadata(script_data)
-            thumbnail_text = self.seo_optimizer.generate_thumbnail_text(metadata)
-            metadata['thumbnail_text'] = thumbnail_text
+            # Thumbnail text comes back with the metadata; this only normalizes it
+            metadata['thumbnail_text'] = self.seo_optimizer.generate_thumbnail_text(metadata)
             self.seo_optimizer.save_metadata(metadata)
             self.logger.info(f"✅ SEO metadata generated")
             return metadata
@@ -183,24 +410,25 @@ class VideoPipeline:
             self.logger.error(f"Thumbnail creation failed: {e}")
             raise
     
-    def _generate_audio(self, script_data):
+    def _generate_audio(self, script_data, output_path=None):
         """Generate audio with TTS and music"""
         try:
             text = self.content_gen.format_script_for_tts(script_data)
-            audio_path, duration = self.audio_producer.create_full_audio(text)
+            audio_path, duration = self.audio_producer.create_full_audio(text, output_path=output_path)
             self.logger.info(f"✅ Audio generated: {duration:.1f}s")
             return audio_path, duration
         except Exception as e:
             self.logger.error(f"Audio production failed: {e}")
             raise
     
-    def _create_video(self, audio_path, thumbnail_path, script_data):
+    def _create_video(self, audio_path, thumbnail_path, script_data, output_path=None):
         """Create final video"""
         try:
             video_path = self.video_editor.create_video(
                 audio_path,
                 thumbnail_path,
-                script_data
+                script_data,
+                output_path
             )
             self.logger.info(f"✅ Video created: {video_path}")
             return video_path
@@ -243,14 +471,49 @@ class VideoPipeline:
                 return stage_name
         return 'Unknown'
     
-    def _save_results(self, results):
+    @staticmethod
+    def _script_summary(script_data):
+        """Summarize a script for the results file (the full script is saved separately)"""
+        return {
+            'topic': script_data.get('topic'),
+            'sections': len(script_data.get('main_content', []))
+        }
+    
+    @staticmethod
+    def _metadata_summary(metadata):
+        """Summarize SEO metadata for the results file (the full metadata is saved separately)"""
+        return {
+            'title': metadata.get('title'),
+            'tags': metadata.get('tags', [])
+        }
+    
+    @staticmethod
+    def _write_json(path, data, pretty=False):
+        """Write JSON compactly (or indented), using orjson when available"""
+        if orjson:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(data, default=str, option=option))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                if pretty:
+                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                else:
+                    json.dump(data, f, separators=(',', ':'), ensure_ascii=False, default=str)
+    
+    def _save_results(self, results, suffix=None):
         """Save pipeline results to file"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if suffix is not None:
+                timestamp = f"{timestamp}_{suffix}"
             results_file = OUTPUT_DIR / f"pipeline_results_{timestamp}.json"
             
-            with open(results_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+            self._write_json(results_file, results)
+            
+            # Human-readable copy only when debugging
+            if self.debug:
+                self._write_json(results_file.with_suffix('.pretty.json'), results, pretty=True)
             
             self.logger.info(f"Results saved to: {results_file}")
         except Exception as e:
@@ -263,6 +526,7 @@ def main():
     
     parser = argparse.ArgumentParser(description='YouTube Automation Pipeline')
     parser.add_argument('--topic', type=str, help='Video topic (optional, will auto-generate if not provided)')
+    parser.add_argument('--topics', type=str, nargs='+', help='Run a batch of topics through the pipeline')
     parser.add_argument('--no-upload', action='store_true', help='Skip YouTube upload')
     parser.add_argument('--no-email', action='store_true', help='Skip email notification')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
@@ -276,6 +540,22 @@ def main():
     pipeline = VideoPipeline(log_level=log_level)
     
     try:
+        if args.topics:
+            batch_results = pipeline.run_batch(
+                args.topics,
+                upload=not args.no_upload,
+                send_email=not args.no_email
+            )
+            
+            print("\n" + "="*60)
+            print("BATCH SUMMARY")
+            print("="*60)
+            for result in batch_results:
+                upload_data = result['stages'].get('youtube_upload', {})
+                print(f"[{result['batch_index']}] {result['status']}: {upload_data.get('video_url', result.get('error', ''))}")
+            print("="*60)
+            return
+        
         results = pipeline.run(
             topic=args.topic,
             upload=not args.no_upload,
@@ -301,6 +581,8 @@ def main():
     except Exception as e:
         print(f"\n\n❌ Pipeline failed: {e}")
         sys.exit(1)
+    finally:
+        pipeline.close()
 
 
 if __name__ == "__main__":
@@ -2,25 +2,77 @@
 SEO Optimizer Module
 Generates SEO-optimized metadata for YouTube videos
 """
+import os
 import json
+import hashlib
+import tempfile
 from datetime import datetime
-from pathlib import Path
 from openai import OpenAI
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OUTPUT_DIR
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encode/decode
+    orjson = None
+from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OUTPUT_DIR, LLM_CACHE_DIR
+from .http_client import shared_http_client
 
 
 class SEOOptimizer:
     """Generate SEO-optimized metadata for YouTube videos"""
     
+    _shared_client = None
+    
     def __init__(self):
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        if SEOOptimizer._shared_client is None:
+            SEOOptimizer._shared_client = OpenAI(api_key=OPENAI_API_KEY, http_client=shared_http_client())
+        self.client = SEOOptimizer._shared_client
         self.model = OPENAI_MODEL
+        self.cache_dir = LLM_CACHE_DIR
+        self.cache_dir.mkdir(exist_ok=True)
     
-    def generate_metadata(self, script_data):
+    def _chat(self, prompt, temperature, max_tokens, use_cache=True, response_format=None):
+        """Run a chat completion, serving identical requests from the on-disk cache"""
+        messages = [{"role": "user", "content": prompt}]
+        request = {"model": self.model, "messages": messages, "temperature": temperature}
+        if response_format:
+            request["response_format"] = response_format
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+        cache_path = self.cache_dir / f"{key}.json"
+        
+        if use_cache and cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)["content"]
+            except (OSError, ValueError, KeyError):
+                pass
+        
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **({"response_format": response_format} if response_format else {})
+        )
+        content = response.choices[0].message.content.strip()
+        
+        # Never cache a JSON-mode reply that does not parse (e.g. cut off by max_tokens)
+        if response_format and response_format.get("type") == "json_object":
+            orjson.loads(content) if orjson else json.loads(content)
+        
+        # Write atomically so a crash never leaves a truncated entry
+        fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"content": content}, f, ensure_ascii=False)
+            os.replace(tmp_name, cache_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        
+        return content
+    
+    def generate_metadata(self, script_data, use_cache=True):
         """Generate complete SEO metadata from script"""
         topic = script_data.get("topic", "Technology")
         
@@ -40,7 +92,8 @@ Generate the following in JSON format:
     "description": "Detailed description (300-500 words) with keywords, timestamps, and call-to-action",
     "tags": ["tag1", "tag2", ...] (15-20 relevant tags, mix of broad and specific),
     "hashtags": ["#hashtag1", "#hashtag2", ...] (5-10 trending hashtags for tech niche),
-    "keywords": ["keyword1", "keyword2", ...] (primary keywords for SEO)
+    "keywords": ["keyword1", "keyword2", ...] (primary keywords for SEO),
+    "thumbnail_text": "2-4 punchy words for large thumbnail overlay"
 }}
 
 Requirements:
@@ -49,36 +102,24 @@ Requirements:
 - Tags: Mix of broad (e.g., "technology") and specific (e.g., "machine learning tutorial")
 - Hashtags: Trending, relevant, not too generic
 - Keywords: Primary search terms people would use
+- Thumbnail text: The 2-4 most important words from the title, attention-grabbing
 
-Make it optimized for YouTube search and discovery!"""
+Make it optimized for YouTube search and discovery!
+Respond with valid JSON only."""
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+        metadata_text = self._chat(
+            prompt,
             temperature=0.7,
-            max_tokens=1500
+            max_tokens=1600,
+            use_cache=use_cache,
+            response_format={"type": "json_object"}
         )
         
-        metadata_text = response.choices[0].message.content.strip()
-        
         # Parse JSON response
         try:
-            # Remove markdown code blocks if present
-            if metadata_text.startswith("```"):
-                metadata_text = metadata_text.split("```")[1]
-                if metadata_text.startswith("json"):
-                    metadata_text = metadata_text[4:]
-            
-            metadata = json.loads(metadata_text)
-        except json.JSONDecodeError:
-            # Fallback metadata
-            metadata = {
-                "title": topic[:60],
-                "description": f"Learn about {topic} in this comprehensive guide.",
-                "tags": ["technology", "tech", "tutorial", "education"],
-                "hashtags": ["#tech", "#technology", "#tutorial"],
-                "keywords": [topic]
-            }
+            metadata = orjson.loads(metadata_text) if orjson else json.loads(metadata_text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"SEO metadata response is not valid JSON: {e}") from e
         
         # Validate and clean metadata
         metadata = self._validate_metadata(metadata)
@@ -105,62 +146,35 @@ Make it optimized for YouTube search and discovery!"""
     
     def _validate_metadata(self, metadata):
         """Validate and clean metadata"""
-        # Ensure title is under 60 characters
-        if len(metadata.get("title", "")) > 60:
-            metadata["title"] = metadata["title"][:57] + "..."
+        title = metadata.get("title", "")
+        description = metadata.get("description", "")
         
-        # Ensure description is not too long (5000 char limit)
-        if len(metadata.get("description", "")) > 5000:
-            metadata["description"] = metadata["description"][:4997] + "..."
+        # Title under 60 characters, description under YouTube's 5000 char limit
+        metadata["title"] = title if len(title) <= 60 else title[:57] + "..."
+        metadata["description"] = description if len(description) <= 5000 else description[:4997] + "..."
         
         # Limit tags (YouTube allows 500 chars total)
         if "tags" in metadata:
-            tags = metadata["tags"][:30]  # Max 30 tags
-            metadata["tags"] = tags
+            metadata["tags"] = metadata["tags"][:30]
         
-        # Ensure hashtags start with #
+        # Max 15 hashtags, each starting with #
         if "hashtags" in metadata:
-            hashtags = []
-            for tag in metadata["hashtags"][:15]:  # Max 15 hashtags
-                if not tag.startswith("#"):
-                    tag = "#" + tag
-                hashtags.append(tag)
-            metadata["hashtags"] = hashtags
+            metadata["hashtags"] = [tag if tag.startswith("#") else "#" + tag for tag in metadata["hashtags"][:15]]
         
         return metadata
     
     def generate_thumbnail_text(self, metadata):
-        """Generate text for thumbnail"""
-        title = metadata.get("title", "")
-        
-        # Extract key words (usually first 2-3 words or most important phrase)
-        words = title.split()
-        
-        if len(words) <= 3:
-            return title
-        
-        # Use AI to extract key phrase
-        prompt = f"""From this YouTube video title, extract the 2-4 most important words that would work well as large text on a thumbnail:
-
-Title: {title}
-
-Return ONLY the key words, nothing else. Make it punchy and attention-grabbing."""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=20
-            )
-            
-            thumbnail_text = response.choices[0].message.content.strip()
-            # Remove quotes if present
-            thumbnail_text = thumbnail_text.strip('"\'')
-            return thumbnail_text
-        except:
-            # Fallback: use first 3 words
-            return " ".join(words[:3])
+        """Get text for thumbnail from the generated metadata"""
+        # JSON mode can still hand back null or a non-string here
+        thumbnail_text = metadata.get("thumbnail_text")
+        if isinstance(thumbnail_text, str):
+            thumbnail_text = thumbnail_text.strip().strip('"\'')
+            if thumbnail_text:
+                return thumbnail_text
+        
+        # Fallback: use first 3 words of the title
+        words = metadata.get("title", "").split()
+        return " ".join(words[:3])
     
     def save_metadata(self, metadata, filename=None):
         """Save metadata to file"""
@@ -170,8 +184,12 @@ Return ONLY the key words, nothing else. Make it punchy and attention-grabbing."
         
         filepath = OUTPUT_DIR / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        if orjson:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
         
         print(f"✅ Metadata saved to: {filepath}")
         return filepath
@@ -2,12 +2,64 @@
 Thumbnail Creator Module
 Creates eye-catching YouTube thumbnails using Pillow
 """
-import random
+import os
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+try:
+    from numba import njit
+except ImportError:  # Optional: JIT-compile the text wrapping kernel
+    njit = None
 from config.settings import THUMBNAIL_SIZE, OUTPUT_DIR, ASSETS_DIR
+from .media_utils import load_font, measure_text
+
+# (font file, size) keys for the thumbnail text
+MAIN_FONT = ("DejaVuSans-Bold.ttf", 120)
+SUBTITLE_FONT = ("DejaVuSans.ttf", 50)
+
+
+def _wrap_indices(lengths, max_chars):
+    """Return the index of the word that starts each new line"""
+    breaks = np.empty(lengths.shape[0], dtype=np.int32)
+    n_breaks = 0
+    current_length = 0
+    line_words = 0
+    
+    for i in range(lengths.shape[0]):
+        if current_length + lengths[i] + 1 <= max_chars:
+            current_length += lengths[i] + 1
+            line_words += 1
+        else:
+            if line_words > 0:
+                breaks[n_breaks] = i
+                n_breaks += 1
+            current_length = lengths[i]
+            line_words = 1
+    
+    return breaks[:n_breaks]
+
+
+if njit is not None:
+    _wrap_indices = njit(cache=True)(_wrap_indices)
+    _wrap_indices(np.zeros(1, dtype=np.int32), 1)  # Compile now, not on the first thumbnail
+
+
+# Per-process creator used by create_thumbnails_batch workers
+_worker_creator = None
+
+
+def _init_worker():
+    """Build one ThumbnailCreator per worker process"""
+    global _worker_creator
+    _worker_creator = ThumbnailCreator()
+
+
+def _render_in_worker(item):
+    """Render a (text, subtitle[, output_path]) item in a worker process"""
+    return _worker_creator.create_thumbnail(*item)
 
 
 class ThumbnailCreator:
@@ -18,6 +70,10 @@ class ThumbnailCreator:
         self.fonts_dir = ASSETS_DIR / "fonts"
         self.templates_dir = ASSETS_DIR / "templates"
         
+        # Fonts are parsed once and reused for every thumbnail
+        self._main_font = load_font(*MAIN_FONT)
+        self._subtitle_font = load_font(*SUBTITLE_FONT)
+        
         # Color schemes for tech content
         self.color_schemes = [
             {
@@ -51,95 +107,136 @@ class ThumbnailCreator:
                 "shadow": (0, 0, 0)
             }
         ]
+        
+        # Backgrounds only depend on the scheme, so render each one once
+        self._prerendered = [
+            self._render_static(scheme, seed) for seed, scheme in enumerate(self.color_schemes)
+        ]
     
     def create_thumbnail(self, text, subtitle=None, output_path=None):
         """Create a thumbnail with text overlay"""
-        print(f"🎨 Creating thumbnail with text: {text}")
+        # Same text and subtitle always map to the same scheme and file
+        key = hashlib.sha1(f"{text}|{subtitle}".encode("utf-8")).hexdigest()[:16]
         
-        # Select random color scheme
-        scheme = random.choice(self.color_schemes)
+        if not output_path:
+            output_path = OUTPUT_DIR / f"thumbnail_{key}.png"
+            if output_path.exists():
+                print(f"♻️ Reusing thumbnail: {output_path}")
+                return output_path
         
-        # Create base image with gradient
-        img = self._create_gradient_background(scheme["background"])
+        print(f"🎨 Creating thumbnail with text: {text}")
         
-        # Add geometric patterns
-        img = self._add_geometric_patterns(img, scheme["accent"])
+        # Pick the color scheme from the key and start from its pre-rendered background
+        index = int(key, 16) % len(self.color_schemes)
+        scheme = self.color_schemes[index]
+        img = self._prerendered[index].copy()
         
         # Add text
         img = self._add_text(img, text, subtitle, scheme)
         
-        # Add border/frame
-        img = self._add_border(img, scheme["accent"])
-        
-        # Save thumbnail
-        if not output_path:
-            output_path = OUTPUT_DIR / f"thumbnail_{random.randint(1000, 9999)}.png"
-        
-        img.save(output_path, "PNG", quality=95)
+        # Save thumbnail atomically so a reused file is never a partial write
+        fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=Path(output_path).parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, "PNG", compress_level=1, optimize=False)
+            os.replace(tmp_name, output_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
         print(f"✅ Thumbnail saved to: {output_path}")
         
         return output_path
     
+    def create_thumbnails_batch(self, items, max_workers=None):
+        """Create thumbnails for (text, subtitle[, output_path]) items across processes"""
+        items = list(items)
+        if len(items) <= 1:
+            return [self.create_thumbnail(*item) for item in items]
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(items))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            return list(pool.map(_render_in_worker, items))
+    
+    def _render_static(self, scheme, seed):
+        """Render gradient, patterns and border for a color scheme"""
+        # Create base image with gradient
+        img = self._create_gradient_background(scheme["background"])
+        
+        # Add geometric patterns (seeded so each scheme always looks the same)
+        img = self._add_geometric_patterns(img, scheme["accent"], np.random.default_rng(seed))
+        
+        # Add border/frame
+        return self._add_border(img, scheme["accent"])
+    
     def _create_gradient_background(self, colors):
         """Create a gradient background"""
-        img = Image.new('RGB', self.size, colors[0])
-        draw = ImageDraw.Draw(img)
+        width, height = self.size
         
-        # Create vertical gradient
-        for i in range(self.size[1]):
-            ratio = i / self.size[1]
-            r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-            g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-            b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-            draw.line([(0, i), (self.size[0], i)], fill=(r, g, b))
+        # Create vertical gradient: interpolate one color per row, then broadcast across
+        ratio = (np.arange(height, dtype=np.float32) / height)[:, None]
+        top = np.array(colors[0], dtype=np.float32)
+        bottom = np.array(colors[1], dtype=np.float32)
+        rows = (top * (1 - ratio) + bottom * ratio).astype(np.uint8)
         
-        return img
+        pixels = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+        return Image.fromarray(pixels, 'RGB')
     
-    def _add_geometric_patterns(self, img, accent_color):
+    def _add_geometric_patterns(self, img, accent_color, rng):
         """Add geometric patterns for visual interest"""
-        draw = ImageDraw.Draw(img, 'RGBA')
+        width, height = self.size
+        yy, xx = np.ogrid[:height, :width]
+        
+        # Count how many shapes cover each pixel so overlaps blend like stacked draws
+        circle_hits = np.zeros((height, width), dtype=np.uint8)
+        line_hits = np.zeros((height, width), dtype=np.uint8)
         
         # Add semi-transparent circles
         for _ in range(3):
-            x = random.randint(0, self.size[0])
-            y = random.randint(0, self.size[1])
-            radius = random.randint(100, 300)
+            cx = int(rng.integers(0, width + 1))
+            cy = int(rng.integers(0, height + 1))
+            radius = int(rng.integers(100, 301))
             
-            # Create semi-transparent accent color
-            color = accent_color + (30,)  # Add alpha
-            draw.ellipse(
-                [x - radius, y - radius, x + radius, y + radius],
-                fill=color
-            )
+            # Only evaluate the circle's bounding box
+            y0, y1 = max(cy - radius, 0), min(cy + radius + 1, height)
+            x0, x1 = max(cx - radius, 0), min(cx + radius + 1, width)
+            if y0 >= y1 or x0 >= x1:
+                continue
+            mask = (xx[:, x0:x1] - cx) ** 2 + (yy[y0:y1] - cy) ** 2 <= radius * radius
+            circle_hits[y0:y1, x0:x1] += mask
         
-        # Add diagonal lines
-        for i in range(5):
-            x = random.randint(0, self.size[0])
-            width = random.randint(2, 5)
-            color = accent_color + (50,)
-            draw.line([(x, 0), (x + 200, self.size[1])], fill=color, width=width)
+        # Add diagonal lines from (x, 0) to (x + 200, height)
+        dx, dy = 200, height
+        length = np.hypot(dx, dy)
+        for _ in range(5):
+            x = int(rng.integers(0, width + 1))
+            line_width = int(rng.integers(2, 6))
+            distance = np.abs(yy * dx - (xx - x) * dy) / length
+            line_hits += distance <= line_width / 2
         
-        return img
+        # Alpha 30 for circles, 50 for lines, composited in a single pass
+        coverage = 1 - (
+            (1 - 30 / 255) ** circle_hits.astype(np.float32)
+            * (1 - 50 / 255) ** line_hits.astype(np.float32)
+        )
+        
+        base = np.asarray(img.convert('RGB'), dtype=np.float32)
+        accent = np.array(accent_color, dtype=np.float32)
+        alpha = coverage[:, :, None]
+        blended = base * (1 - alpha) + accent * alpha
+        
+        return Image.fromarray(blended.astype(np.uint8), 'RGB')
     
     def _add_text(self, img, main_text, subtitle, scheme):
         """Add text overlay to thumbnail"""
         draw = ImageDraw.Draw(img)
-        
-        # Try to load custom font, fallback to default
-        try:
-            # Try to use a bold font
-            main_font = ImageFont.truetype("/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf", 120)
-            subtitle_font = ImageFont.truetype("/usr/share/fonts/dejavu/DejaVuSans.ttf", 50)
-        except:
-            # Fallback to default font
-            main_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
+        main_font = self._main_font
+        subtitle_font = self._subtitle_font
         
         # Wrap text if too long
         main_text = self._wrap_text(main_text, 20)
         
         # Calculate text position (centered)
-        bbox = draw.textbbox((0, 0), main_text, font=main_font)
+        bbox = measure_text(main_text, MAIN_FONT)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
@@ -168,7 +265,7 @@ class ThumbnailCreator:
         # Add subtitle if provided
         if subtitle:
             subtitle = self._wrap_text(subtitle, 40)
-            bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
+            bbox = measure_text(subtitle, SUBTITLE_FONT)
             sub_width = bbox[2] - bbox[0]
             sub_x = (self.size[0] - sub_width) // 2
             sub_y = y + text_height + 30
@@ -193,22 +290,12 @@ class ThumbnailCreator:
     def _wrap_text(self, text, max_chars):
         """Wrap text to fit within max characters per line"""
         words = text.split()
-        lines = []
-        current_line = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + 1 <= max_chars:
-                current_line.append(word)
-                current_length += len(word) + 1
-            else:
-                if current_line:
-                    lines.append(" ".join(current_line))
-                current_line = [word]
-                current_length = len(word)
-        
-        if current_line:
-            lines.append(" ".join(current_line))
+        if not words:
+            return ""
+        
+        lengths = np.fromiter(map(len, words), dtype=np.int32, count=len(words))
+        bounds = [0, *_wrap_indices(lengths, max_chars).tolist(), len(words)]
+        lines = [" ".join(words[start:end]) for start, end in zip(bounds, bounds[1:])]
         
         return "\n".join(lines)
     
@@ -238,9 +325,11 @@ def main():
         ("CLOUD COMPUTING", "Explained Simply"),
     ]
     
-    for main_text, subtitle in test_cases:
-        output_path = OUTPUT_DIR / f"test_thumbnail_{main_text.lower().replace(' ', '_')}.png"
-        creator.create_thumbnail(main_text, subtitle, output_path)
+    items = [
+        (main_text, subtitle, OUTPUT_DIR / f"test_thumbnail_{main_text.lower().replace(' ', '_')}.png")
+        for main_text, subtitle in test_cases
+    ]
+    for output_path in creator.create_thumbnails_batch(items):
         print(f"Created: {output_path}\n")
 
 
@@ -2,26 +2,207 @@
 Video Editor Module
 Creates videos using MoviePy with audio, images, and text overlays
 """
+import os
 import random
+import functools
+import tempfile
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from moviepy.editor import (
-    VideoClip, ImageClip, AudioFileClip, TextClip,
-    CompositeVideoClip, concatenate_videoclips
+    VideoClip, ImageClip, AudioFileClip, VideoFileClip, TextClip, CompositeVideoClip
 )
-from moviepy.video.fx.all import fadein, fadeout
+from moviepy.config import get_setting
 import numpy as np
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
-from config.settings import VIDEO_RESOLUTION, VIDEO_FPS, OUTPUT_DIR, PEXELS_API_KEY
+from PIL import Image
+try:
+    import av
+except ImportError:  # Optional: encode through libav directly instead of MoviePy's ffmpeg pipe
+    av = None
+try:
+    from numba import njit
+except ImportError:  # Optional: JIT-compile the fade kernel
+    njit = None
+try:
+    import cv2
+except ImportError:  # Optional: SIMD image resizing
+    cv2 = None
+from config.settings import (
+    VIDEO_RESOLUTION, VIDEO_FPS, OUTPUT_DIR, ASSETS_DIR, PEXELS_API_KEY, VIDEO_HW_ENCODER, X264_PRESET,
+    AUDIO_BITRATE, VIDEO_RENDERER
+)
+from .media_utils import SYSTEM_FONTS_DIR, measure_text, probe_duration, probe_codecs
+
+# Encoder options when writing through PyAV (vaapi needs hw frame upload, so it uses libx264 there)
+PYAV_ENCODER_OPTIONS = {
+    "libx264": {"preset": X264_PRESET, "crf": "23"},
+    "h264_nvenc": {"preset": "p4", "tune": "hq", "rc": "vbr", "cq": "23", "b": "0"},
+    "h264_qsv": {"global_quality": "23"},
+    "h264_videotoolbox": {"b": "8M"},
+}
+
+# Section fragments encoded at once (hardware encoders cap concurrent sessions)
+SECTION_EXPORT_WORKERS = 2
+
+# ImageMagick font name for overlays, and the file it maps to when one can be found
+OVERLAY_FONT = ("DejaVu-Sans-Bold", "DejaVuSans-Bold.ttf")
+OVERLAY_FONT_SIZE = 60
+
+# One titled stretch of the video
+Section = namedtuple("Section", ["title", "content"])
+
+# Hardware H.264 encoders in order of preference, with their encode settings
+HW_ENCODERS = {
+    "h264_nvenc": ["-preset", "p4", "-tune", "hq", "-rc", "vbr", "-cq", "23", "-b:v", "0", "-pix_fmt", "yuv420p"],
+    "h264_qsv": ["-global_quality", "23", "-pix_fmt", "nv12"],
+    "h264_vaapi": ["-vaapi_device", "/dev/dri/renderD128", "-vf", "format=nv12,hwupload", "-qp", "23"],
+    "h264_videotoolbox": ["-b:v", "8M", "-pix_fmt", "yuv420p"],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_hw_encoder(preference="auto"):
+    """Return the first hardware H.264 encoder that can actually encode here, or None"""
+    if preference == "none":
+        return None
+    candidates = list(HW_ENCODERS) if preference == "auto" else [preference]
+    
+    ffmpeg = get_setting("FFMPEG_BINARY")
+    try:
+        listed = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    
+    for codec in candidates:
+        if codec not in HW_ENCODERS or codec not in listed:
+            continue
+        # A listed encoder can still lack a device or driver, so try encoding one frame
+        try:
+            probe = subprocess.run([
+                ffmpeg, "-hide_banner", "-v", "error",
+                "-f", "lavfi", "-i", "color=black:s=256x256", "-frames:v", "1",
+                "-c:v", codec, *HW_ENCODERS[codec], "-f", "null", "-"
+            ], capture_output=True, timeout=20)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if probe.returncode == 0:
+            return codec
+    
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _has_ffmpeg_filter(name):
+    """True when the ffmpeg build includes the named filter (drawtext needs libfreetype)"""
+    try:
+        listed = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), "-hide_banner", "-filters"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return any(line.split()[1:2] == [name] for line in listed.splitlines())
+
+
+def _filter_escape(value):
+    """Escape a path for use as a filter option inside an ffmpeg filtergraph"""
+    return str(value).replace("\\", "/").replace(":", "\\\\:").replace("'", "\\\\\\'")
+
+
+def _can_stream_copy(path):
+    """True when a file's video is already H.264, so it can go into an MP4 untouched"""
+    return probe_codecs(path, "v")[:1] == ["h264"]
+
+
+def _scale_frame(frame, level):
+    """Scale an RGB frame towards black by level/256 using integer math"""
+    return ((frame.astype(np.uint16) * level) >> 8).astype(np.uint8)
+
+
+if njit is not None:
+    # Serial on purpose: section fragments already fade on several threads at once, and
+    # numba's workqueue threading layer aborts when a parallel kernel is entered concurrently
+    @njit(cache=True)
+    def _scale_frame(frame, level):
+        """Scale an RGB frame towards black by level/256 using integer math"""
+        out = np.empty_like(frame)
+        for y in range(frame.shape[0]):
+            for x in range(frame.shape[1]):
+                for c in range(frame.shape[2]):
+                    out[y, x, c] = (np.uint16(frame[y, x, c]) * level) >> 8
+        return out
+    
+    _scale_frame(np.zeros((1, 1, 3), dtype=np.uint8), 128)  # Compile now, not on the first fade
+
+
+@functools.lru_cache(maxsize=None)
+def _stock_session():
+    """Create the pooled, retrying HTTP session for Pexels on first use"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.5)
+    ))
+    return session
+
+
+@functools.lru_cache(maxsize=64)
+def _rasterize_text(text, fontsize, width, font):
+    """Render a caption through ImageMagick once and return its (RGB, mask) frames"""
+    txt_clip = TextClip(
+        text,
+        fontsize=fontsize,
+        color='white',
+        font=font,
+        stroke_color='black',
+        stroke_width=2,
+        method='caption',
+        size=(width, None)
+    )
+    try:
+        return txt_clip.get_frame(0), txt_clip.mask.get_frame(0)
+    finally:
+        txt_clip.close()
+
+
+def _resolve_font(name, filename):
+    """Return an absolute font file path so ImageMagick skips its font lookup, else the name"""
+    for candidate in (
+        SYSTEM_FONTS_DIR / filename,
+        ASSETS_DIR / "fonts" / filename,
+        Path("/usr/share/fonts/truetype/dejavu") / filename,
+    ):
+        if candidate.exists():
+            return str(candidate)
+    return name
 
 
 class VideoEditor:
     """Create and edit videos programmatically"""
     
+    _font_path = None
+    
     def __init__(self):
         self.resolution = VIDEO_RESOLUTION
         self.fps = VIDEO_FPS
         self.output_dir = OUTPUT_DIR
+        if VideoEditor._font_path is None:
+            VideoEditor._font_path = _resolve_font(*OVERLAY_FONT)
+        
+        # Prefer a GPU encoder for export, falling back to libx264 on the CPU
+        self._hw_codec = _detect_hw_encoder(VIDEO_HW_ENCODER)
+        if self._hw_codec:
+            print(f"⚡ Using hardware video encoder: {self._hw_codec}")
+        
+        # Static text on a static background needs no Python compositing when ffmpeg can draw it
+        self._use_drawtext = VIDEO_RENDERER == "ffmpeg" or (
+            VIDEO_RENDERER == "auto" and Path(self._font_path).is_file() and _has_ffmpeg_filter("drawtext")
+        )
     
     def create_video(self, audio_path, thumbnail_path, script_data, output_path=None):
         """Create a complete video from audio and visuals"""
@@ -32,6 +213,9 @@ class VideoEditor:
         if not output_path:
             output_path = self.output_dir / "final_video.mp4"
         
+        if self._use_drawtext:
+            return self._create_video_drawtext(audio_path, thumbnail_path, script_data, output_path)
+        
         # Load audio
         print("📼 Loading audio...")
         audio = AudioFileClip(str(audio_path))
@@ -48,118 +232,303 @@ class VideoEditor:
             thumbnail_path, script_data, duration
         )
         
-        # Concatenate all clips
-        print("🔗 Concatenating clips...")
-        final_video = concatenate_videoclips(clips, method="compose")
-        
-        # Add audio
-        print("🎵 Adding audio track...")
-        final_video = final_video.set_audio(audio)
-        
-        # Export video
+        # Export video: each section becomes an MPEG-TS fragment, joined without re-encoding
         print(f"💾 Exporting video to: {output_path}")
         print("This may take several minutes...")
         
-        final_video.write_videofile(
-            str(output_path),
-            fps=self.fps,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile=str(self.output_dir / 'temp-audio.m4a'),
-            remove_temp=True,
-            preset='medium',
-            threads=4
-        )
+        with tempfile.TemporaryDirectory(prefix="sections-", dir=self.output_dir) as work_dir:
+            # The AAC transcode runs on its own thread while the sections render
+            with ThreadPoolExecutor(max_workers=min(len(clips), SECTION_EXPORT_WORKERS) + 1) as pool:
+                aac_future = pool.submit(self._transcode_audio_to_aac, audio_path, work_dir)
+                fragments = list(pool.map(
+                    lambda item: self._export_section_ts(item[1], item[0], work_dir),
+                    enumerate(clips)
+                ))
+                aac_path = aac_future.result()
+            
+            # Concatenate all clips and add audio
+            print("🔗 Concatenating clips...")
+            print("🎵 Adding audio track...")
+            self._concat_sections(fragments, aac_path, output_path, work_dir)
         
         # Clean up
         audio.close()
-        final_video.close()
         for clip in clips:
             clip.close()
         
         print(f"✅ Video created successfully: {output_path}")
         return output_path
     
+    def _create_video_drawtext(self, audio_path, thumbnail_path, script_data, output_path):
+        """Render the whole video in one ffmpeg pass: looped thumbnail, drawtext titles, fades"""
+        duration = probe_duration(audio_path)
+        print(f"Audio duration: {duration:.1f} seconds")
+        
+        sections = self._get_script_sections(script_data)
+        section_duration = duration / max(len(sections), 1)
+        
+        print(f"💾 Rendering video with ffmpeg drawtext to: {output_path}")
+        with tempfile.TemporaryDirectory(prefix="drawtext-", dir=self.output_dir) as work_dir:
+            filtergraph = self._build_drawtext_filter(sections, section_duration, duration, work_dir)
+            
+            if self._hw_codec:
+                video_args = ["-c:v", self._hw_codec, *HW_ENCODERS[self._hw_codec]]
+                # vaapi brings its own upload filter; it has to run after the drawtext chain
+                if "-vf" in video_args:
+                    at = video_args.index("-vf")
+                    filtergraph += "," + video_args[at + 1]
+                    del video_args[at:at + 2]
+            else:
+                video_args = ["-c:v", "libx264", "-preset", X264_PRESET, "-crf", "23"]
+            
+            audio_codec = ["copy"] if probe_codecs(audio_path, "a")[:1] == ["aac"] else ["aac", "-b:a", AUDIO_BITRATE]
+            subprocess.run([
+                get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+                "-loop", "1", "-framerate", str(self.fps), "-i", str(thumbnail_path), "-i", str(audio_path),
+                "-map", "0:v:0", "-map", "1:a:0", "-vf", filtergraph,
+                *video_args, "-c:a", *audio_codec,
+                "-t", f"{duration:.3f}", "-shortest", "-movflags", "+faststart", str(output_path)
+            ], check=True)
+        
+        print(f"✅ Video created successfully: {output_path}")
+        return output_path
+    
+    def _build_drawtext_filter(self, sections, section_duration, duration, work_dir):
+        """Build the -vf chain: scale, one timed drawtext per section title, fade in/out"""
+        width, height = self.resolution
+        filters = [f"scale={width}:{height}"]
+        
+        font_option = f"fontfile={_filter_escape(self._font_path)}:" if Path(self._font_path).is_file() else ""
+        for i, section in enumerate(sections):
+            start, end = i * section_duration, (i + 1) * section_duration
+            
+            # Titles go through textfile so quotes, colons and % need no filtergraph escaping
+            text_file = Path(work_dir) / f"title{i}.txt"
+            text_file.write_text(self._wrap_overlay_text(section.title, width - 200), encoding="utf-8")
+            
+            filters.append(
+                f"drawtext={font_option}textfile={_filter_escape(text_file)}:expansion=none"
+                f":fontsize={OVERLAY_FONT_SIZE}:fontcolor=white:borderw=2:bordercolor=black"
+                f":x=(w-text_w)/2:y=100"
+                f":enable='between(t,{start:.3f},{end:.3f})'"
+                f":alpha='min(1,min(t-{start:.3f},{end:.3f}-t)*2)'"
+            )
+        
+        filters.append("fade=t=in:st=0:d=1")
+        filters.append(f"fade=t=out:st={max(duration - 1, 0):.3f}:d=1")
+        filters.append("format=yuv420p")
+        return ",".join(filters)
+    
+    def _wrap_overlay_text(self, text, max_width):
+        """Greedy word wrap to a pixel width, since drawtext doesn't wrap on its own"""
+        font_key = (OVERLAY_FONT[1], OVERLAY_FONT_SIZE)
+        lines = []
+        for word in text.split():
+            candidate = f"{lines[-1]} {word}" if lines else word
+            bbox = measure_text(candidate, font_key)
+            if lines and bbox[2] - bbox[0] <= max_width:
+                lines[-1] = candidate
+            else:
+                lines.append(word)
+        return "\n".join(lines)
+    
+    def attach_audio(self, video_path, audio_path, output_path=None):
+        """Put an audio track on an existing video, stream-copying the video when possible"""
+        if not output_path:
+            output_path = self.output_dir / "final_video.mp4"
+        
+        if _can_stream_copy(video_path):
+            # Nothing to composite: remux instead of re-encoding every frame
+            audio_codec = "copy" if probe_codecs(audio_path, "a")[:1] == ["aac"] else "aac"
+            print(f"⚡ Stream-copying video into: {output_path}")
+            subprocess.run([
+                get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+                "-i", str(video_path), "-i", str(audio_path),
+                "-map", "0:v:0", "-map", "1:a:0",
+                "-c:v", "copy", "-c:a", audio_codec,
+                "-shortest", "-movflags", "+faststart", str(output_path)
+            ], check=True)
+        else:
+            video = VideoFileClip(str(video_path))
+            audio = AudioFileClip(str(audio_path))
+            try:
+                self._write_video_moviepy(video.set_audio(audio), output_path)
+            finally:
+                audio.close()
+                video.close()
+        
+        print(f"✅ Video created successfully: {output_path}")
+        return output_path
+    
+    def _export_section_ts(self, clip, index, work_dir):
+        """Encode one section clip (video only) to an MPEG-TS fragment"""
+        fragment = Path(work_dir) / f"sec{index}.ts"
+        if av is not None:
+            self._write_video_pyav(clip.iter_frames(fps=self.fps, dtype='uint8'), fragment)
+        else:
+            self._write_video_moviepy(clip, fragment, audio=False)
+        return fragment
+    
+    def _transcode_audio_to_aac(self, audio_path, work_dir):
+        """Encode the narration to AAC once so the final mux can stream-copy it"""
+        if probe_codecs(audio_path, "a")[:1] == ["aac"]:
+            return Path(audio_path)
+        
+        aac_path = Path(work_dir) / "audio.m4a"
+        subprocess.run([
+            get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+            "-i", str(audio_path), "-vn", "-c:a", "aac", "-b:a", AUDIO_BITRATE, str(aac_path)
+        ], check=True)
+        return aac_path
+    
+    def _concat_sections(self, fragments, audio_path, output_path, work_dir):
+        """Join TS fragments with the concat demuxer and mux in AAC audio; both streams are copied"""
+        concat_list = Path(work_dir) / "concat.txt"
+        concat_list.write_text("".join(f"file '{fragment.name}'\n" for fragment in fragments))
+        
+        subprocess.run([
+            get_setting("FFMPEG_BINARY"), "-y", "-v", "error",
+            "-f", "concat", "-safe", "0", "-i", str(concat_list), "-i", str(audio_path),
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-c", "copy",
+            "-shortest", "-movflags", "+faststart", str(output_path)
+        ], check=True)
+    
+    def _write_video_moviepy(self, final_video, output_path, audio=True):
+        """Export through MoviePy's ffmpeg subprocess writer"""
+        # Put the moov atom up front so uploads/players can start before the whole file is read
+        container_params = ['-movflags', '+faststart'] if Path(output_path).suffix == '.mp4' else []
+        if self._hw_codec:
+            codec_options = {
+                'codec': self._hw_codec,
+                'ffmpeg_params': HW_ENCODERS[self._hw_codec] + container_params
+            }
+        else:
+            codec_options = {
+                'codec': 'libx264',
+                'preset': X264_PRESET,
+                'threads': max(4, os.cpu_count() or 4),
+                'ffmpeg_params': ['-crf', '23'] + container_params
+            }
+        
+        if audio:
+            audio_options = {
+                'audio_codec': 'aac',
+                'temp_audiofile': str(self.output_dir / f"{Path(output_path).stem}-temp-audio.m4a"),
+                'remove_temp': True
+            }
+        else:
+            audio_options = {'audio': False}
+        
+        final_video.write_videofile(
+            str(output_path),
+            fps=self.fps,
+            **audio_options,
+            **codec_options
+        )
+    
+    def _write_video_pyav(self, frames, output_path):
+        """Encode frames (video only) straight through libav, skipping MoviePy's stdin pipe"""
+        codec = self._hw_codec if self._hw_codec in PYAV_ENCODER_OPTIONS else 'libx264'
+        options = {'movflags': '+faststart'} if Path(output_path).suffix == '.mp4' else {}
+        
+        with av.open(str(output_path), 'w', options=options) as container:
+            video = container.add_stream(codec, rate=self.fps)
+            video.width, video.height = self.resolution
+            video.pix_fmt = 'nv12' if codec == 'h264_qsv' else 'yuv420p'
+            video.options = PYAV_ENCODER_OPTIONS[codec]
+            if codec == 'libx264':
+                video.thread_type = 'AUTO'
+            
+            for i, array in enumerate(frames):
+                frame = av.VideoFrame.from_ndarray(array, format='rgb24')
+                frame.pts = i
+                container.mux(video.encode(frame))
+            
+            container.mux(video.encode())
+    
     def _create_clips_with_text_overlays(self, thumbnail_path, script_data, duration):
         """Create video clips with text overlays on thumbnail background"""
-        clips = []
-        
-        # Load thumbnail as background
-        bg_clip = ImageClip(str(thumbnail_path)).set_duration(duration)
-        bg_clip = bg_clip.resize(self.resolution)
+        # Decode and resize the thumbnail once; every section reuses the same frame array
+        background = self._load_background(thumbnail_path)
         
         # Create segments based on script sections
         sections = self._get_script_sections(script_data)
         
         if not sections:
             # Fallback: just use thumbnail for entire duration
-            return [bg_clip]
+            return [ImageClip(background).set_duration(duration)]
         
         # Calculate duration per section
         section_duration = duration / len(sections)
         
-        current_time = 0
-        for i, section in enumerate(sections):
-            # Create background for this section
-            section_bg = bg_clip.subclip(current_time, min(current_time + section_duration, duration))
-            
-            # Add text overlay
-            if section.get("title"):
-                text_clip = self._create_text_overlay(
-                    section["title"],
-                    section_duration,
-                    position='top'
-                )
-                section_clip = CompositeVideoClip([section_bg, text_clip])
-            else:
-                section_clip = section_bg
-            
-            # Add fade transitions
-            if i == 0:
-                section_clip = fadein(section_clip, 1)
-            if i == len(sections) - 1:
-                section_clip = fadeout(section_clip, 1)
-            
-            clips.append(section_clip)
-            current_time += section_duration
+        # Sections are independent; ImageMagick renders run outside the GIL
+        last = len(sections) - 1
+        with ThreadPoolExecutor(max_workers=min(len(sections), os.cpu_count() or 1)) as pool:
+            return list(pool.map(
+                lambda item: self._build_section_clip(*item, section_duration, background, last),
+                enumerate(sections)
+            ))
+    
+    def _load_background(self, image_path):
+        """Decode an image and resize it to the video resolution as an RGB uint8 array"""
+        img = cv2.imread(str(image_path), cv2.IMREAD_COLOR) if cv2 is not None else None
+        if img is None:
+            with Image.open(image_path) as pil_img:
+                return np.asarray(pil_img.convert('RGB').resize(self.resolution), dtype=np.uint8)
         
-        return clips
+        # INTER_AREA for downscales; thumbnails are usually upscaled, where cubic matches PIL
+        shrinking = img.shape[1] > self.resolution[0]
+        img = cv2.resize(img, self.resolution, interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_CUBIC)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    
+    def _build_section_clip(self, i, section, section_duration, background, last):
+        """Build one section clip: background, title overlay and fades"""
+        # Create background for this section
+        section_bg = ImageClip(background).set_duration(section_duration)
+        
+        # Add text overlay
+        text_clip = self._create_text_overlay(
+            section.title,
+            section_duration,
+            position='top'
+        )
+        section_clip = CompositeVideoClip([section_bg, text_clip])
+        
+        # Add fade transitions
+        if i == 0:
+            section_clip = self._fade(section_clip, 1, fade_in=True)
+        if i == last:
+            section_clip = self._fade(section_clip, 1, fade_in=False)
+        
+        return section_clip
     
     def _get_script_sections(self, script_data):
-        """Extract sections from script data"""
+        """Extract titled sections from script data"""
         sections = []
         
         # Add hook
         if script_data.get("hook"):
-            sections.append({"title": "Introduction", "content": script_data["hook"]})
+            sections.append(Section("Introduction", script_data["hook"]))
         
-        # Add main content sections
+        # Add main content sections (untitled ones have nothing to overlay)
         for section in script_data.get("main_content", []):
-            sections.append({
-                "title": section.get("section_title", ""),
-                "content": section.get("content", "")
-            })
+            title = section.get("section_title")
+            if title:
+                sections.append(Section(title, section.get("content", "")))
         
         # Add conclusion
         if script_data.get("conclusion"):
-            sections.append({"title": "Conclusion", "content": script_data["conclusion"]})
+            sections.append(Section("Conclusion", script_data["conclusion"]))
         
         return sections
     
     def _create_text_overlay(self, text, duration, position='center'):
         """Create a text overlay clip"""
         try:
-            # Create text clip
-            txt_clip = TextClip(
-                text,
-                fontsize=60,
-                color='white',
-                font='DejaVu-Sans-Bold',
-                stroke_color='black',
-                stroke_width=2,
-                method='caption',
-                size=(self.resolution[0] - 200, None)
-            )
+            # Create text clip (repeated titles reuse the cached rasterization)
+            frame, mask = _rasterize_text(text, OVERLAY_FONT_SIZE, self.resolution[0] - 200, self._font_path)
+            txt_clip = ImageClip(frame).set_mask(ImageClip(mask, ismask=True))
             
             # Set duration and position
             txt_clip = txt_clip.set_duration(duration)
@@ -172,19 +541,38 @@ class VideoEditor:
                 txt_clip = txt_clip.set_position('center')
             
             # Add fade in/out
-            txt_clip = fadein(txt_clip, 0.5)
-            txt_clip = fadeout(txt_clip, 0.5)
+            txt_clip = self._fade(txt_clip, 0.5, fade_in=True)
+            txt_clip = self._fade(txt_clip, 0.5, fade_in=False)
             
             return txt_clip
         except Exception as e:
             print(f"⚠️ Could not create text overlay: {e}")
             # Return empty clip
-            return VideoClip(lambda t: np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)).set_duration(duration)
+            return self._create_color_background(duration, color=(0, 0, 0))
+    
+    def _fade(self, clip, duration, fade_in=True):
+        """Fade a clip from (or to) black using a per-frame level table"""
+        frames = max(int(self.fps * duration), 1)
+        levels = (np.arange(frames, dtype=np.int32) * 256) // frames
+        
+        def fl(gf, t):
+            # Frames counted from the start for a fade-in, from the end for a fade-out
+            index = int((t if fade_in else clip.duration - t) * self.fps)
+            frame = gf(t)
+            if index >= frames:
+                return frame
+            return _scale_frame(frame, int(levels[max(index, 0)]))
+        
+        return clip.fl(fl)
     
     def _create_color_background(self, duration, color=(30, 30, 46)):
         """Create a solid color background clip"""
+        # The frame never changes, so fill it once and hand out the same array every time
+        frame = np.empty((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+        frame[:] = color
+        
         def make_frame(t):
-            return np.full((self.resolution[1], self.resolution[0], 3), color, dtype=np.uint8)
+            return frame
         
         return VideoClip(make_frame, duration=duration)
     
@@ -194,12 +582,12 @@ class VideoEditor:
             return None
         
         try:
-            import requests
+            session = _stock_session()
             
             headers = {"Authorization": PEXELS_API_KEY}
-            url = f"https://api.pexels.com/videos/search?query={query}&per_page=1"
+            url = "https://api.pexels.com/videos/search"
             
-            response = requests.get(url, headers=headers)
+            response = session.get(url, headers=headers, params={"query": query, "per_page": 1}, timeout=(5, 30))
             response.raise_for_status()
             
             data = response.json()
@@ -207,12 +595,13 @@ class VideoEditor:
             if data.get("videos"):
                 video_url = data["videos"][0]["video_files"][0]["link"]
                 
-                # Download video
+                # Download video (streamed to disk instead of held in memory)
                 video_path = self.output_dir / f"stock_{query.replace(' ', '_')}.mp4"
-                video_response = requests.get(video_url)
-                
-                with open(video_path, 'wb') as f:
-                    f.write(video_response.content)
+                with session.get(video_url, stream=True, timeout=(5, 60)) as video_response:
+                    video_response.raise_for_status()
+                    with open(video_path, 'wb') as f:
+                        for chunk in video_response.iter_content(chunk_size=1 << 20):
+                            f.write(chunk)
                 
                 return video_path
         except Exception as e:
@@ -222,9 +611,18 @@ class VideoEditor:
 
 
 def main():
-    """Test the video editor"""
-    from audio_producer import AudioProducer
-    from thumbnail_creator import ThumbnailCreator
+    """Test the video editor, or swap the audio track of an existing video"""
+    import sys
+    from .audio_producer import AudioProducer
+    from .thumbnail_creator import ThumbnailCreator
+    
+    # Re-running on a rendered mp4 with new narration: the H.264 video is stream-copied
+    if len(sys.argv) > 1 and sys.argv[1] == 'attach-audio':
+        if len(sys.argv) < 4:
+            print("Usage: python -m src.video_editor attach-audio <video.mp4> <audio> [output.mp4]")
+            return
+        VideoEditor().attach_audio(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+        return
     
     print("Testing Video Editor...")
     
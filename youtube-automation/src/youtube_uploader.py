@@ -3,21 +3,40 @@ YouTube Uploader Module
 Uploads videos to YouTube using the YouTube Data API v3
 """
 import os
-import pickle
+import asyncio
 from pathlib import Path
+import httplib2
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
+try:
+    import aiohttp
+except ImportError:  # Optional: asyncio streaming upload
+    aiohttp = None
 from config.settings import (
     YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET, YOUTUBE_REFRESH_TOKEN,
-    VIDEO_CATEGORY_ID, VIDEO_PRIVACY, OUTPUT_DIR
+    VIDEO_CATEGORY_ID, VIDEO_PRIVACY, OUTPUT_DIR, YOUTUBE_UPLOADER
 )
 
+# Upload in 8MB chunks; files at or below the threshold go up in a single request
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+HTTP_TIMEOUT = 300
+
+# YouTube rejects uploads larger than 256GB
+MAX_UPLOAD_SIZE = 256 * 1024**3
+
+# Resumable upload endpoint used by the aiohttp path, and how often it resumes after a dropped connection
+RESUMABLE_UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+UPLOAD_RETRIES = 5
+
+# OAuth token cache (authorized-user JSON, readable by google-auth directly)
+TOKEN_FILE = OUTPUT_DIR / "youtube_token.json"
+
 
 class YouTubeUploader:
     """Upload videos to YouTube with metadata"""
@@ -27,7 +46,7 @@ class YouTubeUploader:
     def __init__(self):
         self.credentials = None
         self.youtube = None
-        self.token_file = OUTPUT_DIR / "youtube_token.pickle"
+        self.token_file = TOKEN_FILE
     
     def authenticate(self):
         """Authenticate with YouTube API"""
@@ -35,8 +54,10 @@ class YouTubeUploader:
         
         # Try to load saved credentials
         if self.token_file.exists():
-            with open(self.token_file, 'rb') as token:
-                self.credentials = pickle.load(token)
+            try:
+                self.credentials = Credentials.from_authorized_user_file(str(self.token_file), self.SCOPES)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable token file: {e}")
         
         # If no valid credentials, authenticate
         if not self.credentials or not self.credentials.valid:
@@ -68,26 +89,22 @@ class YouTubeUploader:
                     raise ValueError("YouTube API credentials not configured.")
             
             # Save credentials
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(self.credentials, token)
+            with open(self.token_file, 'w', encoding='utf-8') as token:
+                token.write(self.credentials.to_json())
         
-        # Build YouTube service
-        self.youtube = build('youtube', 'v3', credentials=self.credentials)
+        # Build YouTube service on one keep-alive connection with a generous upload timeout
+        http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        self.youtube = build('youtube', 'v3', http=http)
         print("✅ YouTube API authenticated successfully")
     
-    def upload_video(self, video_path, metadata, thumbnail_path=None):
-        """Upload video to YouTube with metadata"""
-        if not self.youtube:
-            self.authenticate()
-        
-        print("\n" + "="*50)
-        print("YOUTUBE UPLOAD")
-        print("="*50)
-        print(f"Video: {video_path}")
-        print(f"Title: {metadata.get('title', 'Untitled')}")
-        
-        # Prepare video metadata
-        body = {
+    def _preflight(self, size):
+        """Fail fast on files YouTube would reject, before any bytes are sent"""
+        if size > MAX_UPLOAD_SIZE:
+            raise ValueError(f"Video is {size / 1024**3:.1f}GB; YouTube accepts at most 256GB")
+    
+    def _video_body(self, metadata):
+        """Build the videos.insert resource from our metadata"""
+        return {
             'snippet': {
                 'title': metadata.get('title', 'Untitled Video'),
                 'description': metadata.get('description', ''),
@@ -99,12 +116,34 @@ class YouTubeUploader:
                 'selfDeclaredMadeForKids': False
             }
         }
+    
+    def upload_video(self, video_path, metadata, thumbnail_path=None):
+        """Upload video to YouTube with metadata"""
+        if not self.youtube:
+            self.authenticate()
         
-        # Create media upload
+        size = Path(video_path).stat().st_size
+        
+        # Opt-in asyncio uploader for large files: one streamed PUT instead of a round trip per chunk
+        if YOUTUBE_UPLOADER == "aiohttp" and size > RESUMABLE_THRESHOLD:
+            return asyncio.run(self.upload_video_async(video_path, metadata, thumbnail_path))
+        
+        self._preflight(size)
+        
+        print("\n" + "="*50)
+        print("YOUTUBE UPLOAD")
+        print("="*50)
+        print(f"Video: {video_path}")
+        print(f"Title: {metadata.get('title', 'Untitled')}")
+        
+        body = self._video_body(metadata)
+        
+        # Create media upload (small files skip the resumable session round trip)
+        resumable = size > RESUMABLE_THRESHOLD
         media = MediaFileUpload(
             str(video_path),
-            chunksize=1024*1024,  # 1MB chunks
-            resumable=True,
+            chunksize=UPLOAD_CHUNK_SIZE,
+            resumable=resumable,
             mimetype='video/mp4'
         )
         
@@ -119,7 +158,7 @@ class YouTubeUploader:
                 media_body=media
             )
             
-            response = None
+            response = None if resumable else request.execute()
             while response is None:
                 status, response = request.next_chunk()
                 if status:
@@ -157,14 +196,146 @@ class YouTubeUploader:
                 'error': str(e)
             }
     
+    async def upload_video_async(self, video_path, metadata, thumbnail_path=None):
+        """Upload video to YouTube over a resumable session, streaming the file with aiohttp"""
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for upload_video_async")
+        if not self.youtube:
+            self.authenticate()
+        
+        size = Path(video_path).stat().st_size
+        self._preflight(size)
+        
+        print("\n" + "="*50)
+        print("YOUTUBE UPLOAD")
+        print("="*50)
+        print(f"Video: {video_path}")
+        print(f"Title: {metadata.get('title', 'Untitled')}")
+        
+        if not self.credentials.valid:
+            self.credentials.refresh(Request())
+        
+        body = self._video_body(metadata)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=HTTP_TIMEOUT)
+        
+        try:
+            print("📤 Uploading video to YouTube...")
+            print("This may take several minutes depending on file size...")
+            
+            async with aiohttp.ClientSession(
+                headers={'Authorization': f'Bearer {self.credentials.token}'}, timeout=timeout
+            ) as session:
+                # Open the resumable session; Google returns its URL in the Location header
+                async with session.post(
+                    RESUMABLE_UPLOAD_URL,
+                    params={'uploadType': 'resumable', 'part': ','.join(body.keys())},
+                    json=body,
+                    headers={'X-Upload-Content-Type': 'video/mp4', 'X-Upload-Content-Length': str(size)}
+                ) as resp:
+                    resp.raise_for_status()
+                    session_url = resp.headers['Location']
+                
+                # Ranges must arrive in order, so send the rest of the file as one streamed PUT
+                # and only ask the server for its offset when a connection drops
+                offset, response = 0, None
+                for attempt in range(UPLOAD_RETRIES):
+                    try:
+                        response = await self._put_file(session, session_url, video_path, offset, size)
+                    except aiohttp.ClientResponseError as e:
+                        # 4xx (expired token, dead session) won't succeed on retry; only 5xx is resumable
+                        if e.status < 500:
+                            raise
+                        print(f"⚠️ Upload interrupted ({e}), resuming...")
+                        await asyncio.sleep(2 ** attempt)
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        print(f"⚠️ Upload interrupted ({e}), resuming...")
+                        await asyncio.sleep(2 ** attempt)
+                    if response is not None:
+                        break
+                    offset, response = await self._query_offset(session, session_url, size)
+                    if response is not None:
+                        break
+                else:
+                    raise RuntimeError(f"Upload did not complete after {UPLOAD_RETRIES} attempts")
+            
+            video_id = response['id']
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            
+            print(f"✅ Video uploaded successfully!")
+            print(f"Video ID: {video_id}")
+            print(f"Video URL: {video_url}")
+            
+            # Upload thumbnail if provided
+            if thumbnail_path and Path(thumbnail_path).exists():
+                await asyncio.to_thread(self.upload_thumbnail, video_id, thumbnail_path)
+            
+            return {
+                'video_id': video_id,
+                'video_url': video_url,
+                'title': metadata.get('title'),
+                'status': 'success'
+            }
+        
+        except aiohttp.ClientResponseError as e:
+            print(f"❌ YouTube API error: {e}")
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        except Exception as e:
+            print(f"❌ Upload failed: {e}")
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    async def _put_file(self, session, session_url, video_path, offset, size):
+        """PUT the file from offset to the end; returns the video resource, or None if incomplete"""
+        async def chunks():
+            with open(video_path, 'rb') as f:
+                f.seek(offset)
+                sent = offset
+                while True:
+                    chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+                    sent += len(chunk)
+                    print(f"Upload progress: {int(sent * 100 / size)}%")
+        
+        headers = {
+            'Content-Length': str(size - offset),
+            'Content-Range': f'bytes {offset}-{size - 1}/{size}',
+            'Content-Type': 'video/mp4'
+        }
+        async with session.put(session_url, data=chunks(), headers=headers) as resp:
+            if resp.status in (200, 201):
+                return await resp.json()
+            if resp.status != 308:
+                resp.raise_for_status()
+        return None
+    
+    async def _query_offset(self, session, session_url, size):
+        """Ask the resumable session how much it has; returns (next offset, video resource or None)"""
+        headers = {'Content-Length': '0', 'Content-Range': f'bytes */{size}'}
+        async with session.put(session_url, headers=headers) as resp:
+            if resp.status in (200, 201):
+                return size, await resp.json()
+            if resp.status != 308:
+                resp.raise_for_status()
+            # Range looks like "bytes=0-12345"; no header means nothing was stored yet
+            received = resp.headers.get('Range')
+            return (int(received.rsplit('-', 1)[1]) + 1 if received else 0), None
+    
     def upload_thumbnail(self, video_id, thumbnail_path):
         """Upload custom thumbnail for video"""
         try:
             print(f"🖼️ Uploading thumbnail...")
             
+            # Media uploads can't go in a BatchHttpRequest, so this stays its own (small) request
             request = self.youtube.thumbnails().set(
                 videoId=video_id,
-                media_body=MediaFileUpload(str(thumbnail_path))
+                media_body=MediaFileUpload(str(thumbnail_path), mimetype='image/png', resumable=False)
             )
             
             response = request.execute()
@@ -237,9 +408,9 @@ def setup_youtube_auth():
     credentials = flow.run_local_server(port=8080)
     
     # Save credentials
-    token_file = OUTPUT_DIR / "youtube_token.pickle"
-    with open(token_file, 'wb') as token:
-        pickle.dump(credentials, token)
+    token_file = TOKEN_FILE
+    with open(token_file, 'w', encoding='utf-8') as token:
+        token.write(credentials.to_json())
     
     print(f"\n✅ Authentication successful!")
     print(f"Token saved to: {token_file}")
@@ -257,7 +428,7 @@ def main():
     else:
         print("YouTube Uploader Module")
         print("\nTo setup authentication, run:")
-        print("python youtube_uploader.py setup")
+        print("python -m src.youtube_uploader setup")
         print("\nOr configure credentials in .env file:")
         print("- YOUTUBE_CLIENT_ID")
         print("- YOUTUBE_CLIENT_SECRET")
@@ -0,0 +1,114 @@
+"""
+Tests for the audio producer's TTS path
+"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from src import audio_producer
+from src.audio_producer import AudioProducer
+
+
+def _fake_tts(text, output_path):
+    """Stand-in backend that writes the text as the 'audio'"""
+    Path(output_path).write_bytes(text.encode("utf-8"))
+    return output_path
+
+
+class SynthesizeWithoutOutputPathTest(unittest.TestCase):
+    """gTTS (the default backend) must return cache paths when output_path is None"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        tmp = Path(self._tmp.name)
+
+        # Keep AudioProducer's cache directories out of the working tree
+        for name in ("TTS_CACHE_DIR", "FINAL_AUDIO_CACHE_DIR"):
+            patcher = mock.patch.object(audio_producer, name, tmp / name.lower())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.producer = AudioProducer()
+
+        patcher = mock.patch.object(AudioProducer, "_gtts_tts", side_effect=_fake_tts)
+        self.gtts = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_synthesize_returns_cache_path(self):
+        path = self.producer._synthesize("Hello world.", None)
+        self.assertIsNotNone(path)
+        self.assertEqual(Path(path).read_bytes(), b"Hello world.")
+
+        # A second call is served from the cache
+        self.assertEqual(self.producer._synthesize("Hello world.", None), path)
+        self.assertEqual(self.gtts.call_count, 1)
+
+    def test_text_to_pcm_joins_sentence_parts(self):
+        with mock.patch.object(audio_producer, "_decode_bytes",
+                               return_value=np.zeros((10, 2), dtype=np.int16)) as decode:
+            pcm = self.producer.text_to_pcm("Hello world. Second one!")
+
+        decode.assert_called_once_with(b"Hello world.Second one!")
+        self.assertEqual(pcm.shape, (10, 2))
+
+    def test_concurrent_requests_synthesize_once(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_tts(text, output_path):
+            started.set()
+            release.wait(5)
+            return _fake_tts(text, output_path)
+
+        self.gtts.side_effect = slow_tts
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.producer._synthesize("Same.", None)))
+        second = threading.Thread(target=lambda: results.append(self.producer._synthesize("Same.", None)))
+        first.start()
+        started.wait(5)
+        second.start()
+        time.sleep(0.1)  # Let the second caller find the first one in flight
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(self.gtts.call_count, 1)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0], results[1])
+
+
+class CacheEvictionTest(unittest.TestCase):
+    """The TTS cache is only rescanned once its running size goes over budget"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache_dir = Path(self._tmp.name)
+
+    def _write(self, name, size):
+        path = self.cache_dir / name
+        path.write_bytes(b"x" * size)
+        audio_producer._track_cache_write(self.cache_dir, 1000, size)
+        return path
+
+    def test_scans_only_when_over_budget(self):
+        with mock.patch.object(audio_producer, "_evict_lru", wraps=audio_producer._evict_lru) as evict:
+            for i in range(5):
+                self._write(f"{i}.mp3", 100)
+            self.assertEqual(evict.call_count, 1)  # Initial scan only
+
+            self._write("big.mp3", 600)
+            self.assertEqual(evict.call_count, 2)
+
+        remaining = sum(p.stat().st_size for p in self.cache_dir.iterdir())
+        self.assertLessEqual(remaining, 900)
+        self.assertTrue((self.cache_dir / "big.mp3").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()